@@ -0,0 +1,137 @@
+import argparse
+import copy
+import time
+
+import numpy as np
+
+from bingo_hall import CELL_LINES, LINE_COUNT, FREE
+
+# CELL_BITS[i] is the daub bit of cell i; LINE_MASKS[j] has the bits of the
+# five cells of line j set
+CELL_BITS = (1 << np.arange(25, dtype=np.uint32)).astype(np.uint32)
+LINE_MASKS = np.array([sum(1 << cell for cell in range(25) if line in CELL_LINES[cell])
+                       for line in range(LINE_COUNT)], dtype=np.uint32)
+
+
+def random_cards(count, rng):
+    # count standard 75-ball cards as a (count, 25) uint8 array in row-major
+    # order, column B holding 1-15 up to O holding 61-75, free centre
+    cards = np.empty((count, 5, 5), dtype=np.uint8)
+    for col in range(5):
+        picks = rng.random((count, 15), dtype=np.float32).argsort(axis=1)[:, :5]
+        cards[:, :, col] = picks + 15 * col + 1
+    cards[:, 2, 2] = FREE
+    return cards.reshape(count, 25)
+
+
+def count_lines(daubs):
+    # Completed lines for every daub mask in daubs, one line at a time so no
+    # (cards, 12) temporary is needed
+    lines = np.zeros(len(daubs), dtype=np.uint8)
+    scratch = np.empty(len(daubs), dtype=np.uint32)
+    for mask in LINE_MASKS:
+        np.bitwise_and(daubs, mask, out=scratch)
+        lines += scratch == mask
+    return lines
+
+
+class BingoCardArray:
+    # Cards held as NumPy arrays: the numbers as a (cards, 25) uint8 array
+    # and the daub state as one 25-bit mask per card, 4 bytes each. The
+    # inverted index is kept in CSR form: positions (card * 25 + cell) sorted
+    # by number, with offsets[n]:offsets[n + 1] covering number n.
+
+    def __init__(self, numbers, lines_required=1, daubs=None):
+        # daubs may be a caller-owned uint32 buffer with one entry per card,
+        # such as a view of shared memory; it is cleared here
+        self.numbers = np.ascontiguousarray(numbers, dtype=np.uint8).reshape(-1, 25)
+        self.lines_required = lines_required
+
+        flat = self.numbers.ravel()
+        self.positions = np.argsort(flat, kind="stable").astype(np.uint32)
+        self.offsets = np.zeros(257, dtype=np.int64)
+        np.cumsum(np.bincount(flat, minlength=256), out=self.offsets[1:])
+        self.daubs = np.empty(len(self.numbers), dtype=np.uint32) if daubs is None else daubs
+        self.reset()
+
+    def share(self, daubs=None):
+        # Another game on the same cards, sharing the number index
+        game = copy.copy(self)
+        game.daubs = np.empty_like(self.daubs) if daubs is None else daubs
+        game.reset()
+        return game
+
+    def reset(self):
+        # Clear every card in place, leaving only the free cells daubed
+        self.daubs[:] = np.bitwise_or.reduce(
+            np.where(self.numbers == FREE, CELL_BITS, np.uint32(0)), axis=1)
+        self.called = []
+
+    @property
+    def card_count(self):
+        return len(self.daubs)
+
+    def daub(self, number):
+        # Daub number on every card holding it with a single scatter and
+        # return the ids of those cards
+        return self._daub(number)[0]
+
+    def _daub(self, number):
+        if number in self.called:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint32)
+        self.called.append(number)
+        positions = self.positions[self.offsets[number]:self.offsets[number + 1]]
+        cards = (positions // 25).astype(np.int64)
+        bits = CELL_BITS[positions % 25]
+        # A card holds each number at most once, so cards has no repeats
+        self.daubs[cards] |= bits
+        return cards, bits
+
+    def call(self, number):
+        # Daub number and return the ids of the cards that became winners
+        # with this call
+        cards, bits = self._daub(number)
+        after = self.daubs[cards]
+        won = ((count_lines(after) >= self.lines_required)
+               & (count_lines(after & ~bits) < self.lines_required))
+        return cards[won]
+
+    def lines(self):
+        # Completed lines on every card
+        return count_lines(self.daubs)
+
+    def winners(self):
+        return np.flatnonzero(self.lines() >= self.lines_required)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bitmask bingo cards")
+    parser.add_argument("--cards", type=int, default=1000000)
+    parser.add_argument("--lines", type=int, default=1, help="lines needed to win")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    hall = BingoCardArray(random_cards(args.cards, rng), args.lines)
+    print(f"Built {args.cards} cards in {time.perf_counter() - start:.2f} s; "
+          f"daub state {hall.daubs.nbytes / 1e6:.1f} MB")
+
+    calls = rng.permutation(np.arange(1, 76))
+    start = time.perf_counter()
+    for count, number in enumerate(calls, 1):
+        winners = hall.call(int(number))
+        if len(winners):
+            break
+    elapsed = time.perf_counter() - start
+    print(f"First winners after {count} calls: {len(winners)} card(s); "
+          f"{elapsed / count * 1000:.2f} ms per call")
+
+    start = time.perf_counter()
+    total = len(hall.winners())
+    print(f"Full-hall win check: {total} winner(s) in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from bingo_bitmask import random_cards
+from bingo_hall import FREE
+
+# Card stock files: a fixed header followed by fixed-width records, one per
+# card, so card n is at HEADER.size + n * record_size and can be read from a
+# memory map without parsing anything before it. The header records the game
+# (75 or 90 balls) so a stock cannot be loaded into the wrong game.
+MAGIC = b"BINGOSTK"
+HEADER = struct.Struct("<8sBxHQ")  # magic, balls, record size, record count
+
+# A 75-ball card record is its 24 numbers in row-major order, skipping the
+# free centre
+CENTRE = 12
+RECORD_SIZE = 24
+
+
+def write_header(f, balls, record_size, count):
+    f.write(HEADER.pack(MAGIC, balls, record_size, count))
+
+
+def finish_stock(f, balls, record_size, count):
+    # Fill in the final record count and make the file durable
+    f.seek(0)
+    write_header(f, balls, record_size, count)
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class StockFile:
+    # Read-only memory map of a stock file. Records are returned as views
+    # of the mapped pages; nothing is read until it is used.
+
+    def __init__(self, path, balls):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, file_balls, self.record_size, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC or file_balls != balls:
+            self.data.close()
+            raise ValueError(f"{path} is not a {balls}-ball card stock")
+        self.offset = HEADER.size
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.data.close()
+
+    def record(self, n):
+        if not 0 <= n < self.count:
+            raise IndexError(f"record {n} out of range")
+        start = self.offset + n * self.record_size
+        return self.data[start:start + self.record_size]
+
+    def records(self, start=0, stop=None):
+        # Records start to stop as a (records, record_size) uint8 array that
+        # shares memory with the map
+        stop = self.count if stop is None else min(stop, self.count)
+        start = min(start, stop)
+        return np.frombuffer(self.data, dtype=np.uint8,
+                             count=(stop - start) * self.record_size,
+                             offset=self.offset + start * self.record_size
+                             ).reshape(-1, self.record_size)
+
+
+class CardFile(StockFile):
+    # 75-ball card stock
+
+    def __init__(self, path):
+        super().__init__(path, 75)
+
+    def card(self, n):
+        # Card n as 25 numbers in row-major order with FREE in the centre
+        numbers = list(self.record(n))
+        numbers.insert(CENTRE, FREE)
+        return numbers
+
+    def cards(self, start=0, stop=None):
+        # Cards start to stop as a (cards, 25) uint8 array, ready for
+        # BingoCardArray or BingoHall.add_cards
+        return np.insert(self.records(start, stop), CENTRE, FREE, axis=1)
+
+
+def generate(path, count, seed=None, batch_size=65536):
+    # Write count distinct 75-ball cards to path. Cards are drawn in batches
+    # and each is kept only if its 24 numbers have not been seen before, so
+    # memory use is the set of keys plus one batch. Returns the card count.
+    rng = np.random.default_rng(seed)
+    seen = set()
+    written = 0
+    with open(path, "wb") as f:
+        write_header(f, 75, RECORD_SIZE, 0)
+        while written < count:
+            batch = np.delete(random_cards(batch_size, rng), CENTRE, axis=1)
+            data = batch.tobytes()
+            keep = []
+            for i in range(len(batch)):
+                key = data[i * RECORD_SIZE:(i + 1) * RECORD_SIZE]
+                if key not in seen:
+                    seen.add(key)
+                    keep.append(i)
+            keep = keep[:count - written]
+            f.write(batch[keep].tobytes())
+            written += len(keep)
+        finish_stock(f, 75, RECORD_SIZE, written)
+    return written
+
+
+def write_cards(path, numbers):
+    # Write a (cards, 25) array of cards to path as a stock; returns the
+    # card count
+    records = np.delete(np.asarray(numbers, dtype=np.uint8).reshape(-1, 25), CENTRE, axis=1)
+    with open(path, "wb") as f:
+        write_header(f, 75, RECORD_SIZE, 0)
+        f.write(records.tobytes())
+        finish_stock(f, 75, RECORD_SIZE, len(records))
+    return len(records)
+
+
+def format_card(numbers):
+    lines = ["  B   I   N   G   O"]
+    for row in range(5):
+        lines.append(" ".join(" * " if number == FREE else f"{number:3}"
+                              for number in numbers[row * 5:row * 5 + 5]))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate unique 75-ball bingo cards")
+    parser.add_argument("path", help="card stock file")
+    parser.add_argument("--count", type=int, default=1000000,
+                        help="cards to generate")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--show", type=int, nargs="+", metavar="N",
+                        help="print cards from an existing stock instead")
+    args = parser.parse_args()
+
+    if args.show:
+        stock = CardFile(args.path)
+        for n in args.show:
+            print(f"Card {n}\n{format_card(stock.card(n))}\n")
+        stock.close()
+        return
+
+    start = time.perf_counter()
+    written = generate(args.path, args.count, args.seed)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.path)
+    print(f"Wrote {written} unique cards ({size / 1e6:.1f} MB) to {args.path} "
+          f"in {elapsed:.2f} s")
+
+    start = time.perf_counter()
+    stock = CardFile(args.path)
+    cards = stock.cards()
+    print(f"Loaded {len(cards)} cards in {(time.perf_counter() - start) * 1000:.0f} ms")
+    stock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+
+import numpy as np
+
+from bingo_bitmask import BingoCardArray
+from bingo_cards import CardFile, write_cards
+
+# A checkpointed hall is a directory of three files:
+#   cards.stk  the card stock, in the bingo_cards format
+#   calls.log  every call in order, one byte each, NEW_GAME before each game
+#   daubs.dat  a header page, then one uint32 daub mask per card, mapped
+#              into memory and daubed in place
+#
+# A call is appended to the log and fsynced before any card is daubed, so
+# the log always covers everything the daub region shows. Every few calls
+# the region is flushed, and only then is the header's count of applied
+# log records updated and flushed. After a crash the region holds the
+# state as of the applied count plus some of the later daubs, and since
+# daubing is idempotent, replaying the log from the applied count restores
+# it exactly.
+STOCK_NAME = "cards.stk"
+LOG_NAME = "calls.log"
+DAUBS_NAME = "daubs.dat"
+
+DAUB_MAGIC = b"BINGODAB"
+# magic, card count, lines required, region offset, applied log records
+DAUB_HEADER = struct.Struct("<8sQIIQ")
+# The region starts on its own page so it can be flushed apart from the header
+REGION_OFFSET = mmap.ALLOCATIONGRANULARITY
+NEW_GAME = 255
+FLUSH_EVERY = 8
+
+
+def _fsync_directory(directory):
+    # Make the files just created in directory durable; not possible on Windows
+    if os.name == "posix":
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def create(directory, numbers, lines_required=1):
+    # Start a session over a (cards, 25) array of cards. The log opens with
+    # NEW_GAME and nothing applied, so the first open clears the cards.
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists(os.path.join(directory, LOG_NAME)):
+        raise FileExistsError(f"{directory} already holds a session")
+    count = write_cards(os.path.join(directory, STOCK_NAME), numbers)
+    with open(os.path.join(directory, DAUBS_NAME), "wb") as f:
+        f.write(DAUB_HEADER.pack(DAUB_MAGIC, count, lines_required, REGION_OFFSET, 0))
+        f.truncate(REGION_OFFSET + 4 * count)
+        f.flush()
+        os.fsync(f.fileno())
+    with open(os.path.join(directory, LOG_NAME), "wb") as f:
+        f.write(bytes((NEW_GAME,)))
+        f.flush()
+        os.fsync(f.fileno())
+    _fsync_directory(directory)
+    return count
+
+
+class CheckpointedHall:
+    # A BingoCardArray whose daub masks live in the mapped region of a
+    # session directory. Opening a session recovers it: the log's torn
+    # tail, if any, is cut off and the calls after the applied count are
+    # replayed.
+
+    def __init__(self, directory, flush_every=FLUSH_EVERY):
+        self.directory = directory
+        self.flush_every = flush_every
+
+        stock = CardFile(os.path.join(directory, STOCK_NAME))
+        numbers = stock.cards()
+        stock.close()
+        with open(os.path.join(directory, DAUBS_NAME), "r+b") as f:
+            self.data = mmap.mmap(f.fileno(), 0)
+        magic, count, self.lines_required, self.region_offset, applied = \
+            DAUB_HEADER.unpack_from(self.data)
+        if magic != DAUB_MAGIC or count != len(numbers):
+            self.data.close()
+            raise ValueError(f"{directory} does not hold a matching daub region")
+        self.cards = BingoCardArray(numbers, self.lines_required)
+        # Keep the state on disk rather than the freshly cleared one
+        self.cards.daubs = np.frombuffer(self.data, dtype=np.uint32, count=count,
+                                         offset=self.region_offset)
+
+        self.log = open(os.path.join(directory, LOG_NAME), "r+b")
+        records = self.log.read()
+        self.calls = self._valid_length(records)
+        if self.calls < len(records):
+            # A call whose record never became durable was never daubed
+            self.log.truncate(self.calls)
+            os.fsync(self.log.fileno())
+        self.log.seek(self.calls)
+
+        # Nothing past the durable log can have been applied
+        self.applied = min(applied, self.calls)
+        game_start = records.rfind(bytes((NEW_GAME,)), 0, self.applied) + 1
+        self.cards.called = list(records[game_start:self.applied])
+        self.replayed = self.calls - self.applied
+        for record in records[self.applied:self.calls]:
+            if record == NEW_GAME:
+                self.cards.reset()
+            else:
+                self.cards.daub(record)
+        if self.replayed:
+            self.checkpoint()
+
+    @staticmethod
+    def _valid_length(records):
+        # Length of the log up to the first byte that is not a record
+        values = np.frombuffer(records, dtype=np.uint8)
+        bad = np.flatnonzero(((values < 1) | (values > 75)) & (values != NEW_GAME))
+        return int(bad[0]) if len(bad) else len(records)
+
+    @property
+    def card_count(self):
+        return self.cards.card_count
+
+    @property
+    def called(self):
+        return self.cards.called
+
+    def _append(self, record):
+        self.log.write(bytes((record,)))
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.calls += 1
+
+    def call(self, number):
+        # Log number, then daub it; returns the cards that became winners
+        if number in self.cards.called:
+            return np.empty(0, dtype=np.int64)
+        self._append(number)
+        winners = self.cards.call(number)
+        if self.calls - self.applied >= self.flush_every:
+            self.checkpoint()
+        return winners
+
+    def reset(self):
+        # Start a new game with the same cards
+        self._append(NEW_GAME)
+        self.cards.reset()
+        self.checkpoint()
+
+    def checkpoint(self):
+        # Flush the region, then record that the log is applied up to here
+        self.data.flush(self.region_offset, len(self.data) - self.region_offset)
+        DAUB_HEADER.pack_into(self.data, 0, DAUB_MAGIC, self.card_count,
+                              self.lines_required, self.region_offset, self.calls)
+        self.data.flush(0, self.region_offset)
+        self.applied = self.calls
+
+    def winners(self):
+        return self.cards.winners()
+
+    def close(self):
+        self.checkpoint()
+        # The views of the map must go before it can be closed
+        del self.cards
+        self.data.close()
+        self.log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crash-safe checkpointed bingo hall")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    create_parser = modes.add_parser("create", help="start a session from a card stock")
+    create_parser.add_argument("directory")
+    create_parser.add_argument("--stock", required=True,
+                               help="card stock file made by bingo_cards.py")
+    create_parser.add_argument("--lines", type=int, default=1, help="lines needed to win")
+
+    play_parser = modes.add_parser("play", help="recover a session and keep calling")
+    play_parser.add_argument("directory")
+    play_parser.add_argument("--calls", type=int, default=75, help="calls to make")
+    play_parser.add_argument("--flush-every", type=int, default=FLUSH_EVERY,
+                             help="calls between daub region flushes")
+    play_parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.mode == "create":
+        stock = CardFile(args.stock)
+        numbers = stock.cards()
+        stock.close()
+        count = create(args.directory, numbers, args.lines)
+        print(f"Created a session of {count} cards in {args.directory}")
+        return
+
+    start = time.perf_counter()
+    hall = CheckpointedHall(args.directory, args.flush_every)
+    print(f"Recovered {hall.card_count} cards in {time.perf_counter() - start:.2f} s: "
+          f"{hall.calls} log records, {hall.replayed} replayed, "
+          f"{len(hall.called)} called this game")
+
+    rng = random.Random(args.seed)
+    latencies = []
+    games = 0
+    try:
+        for _ in range(args.calls):
+            remaining = [number for number in range(1, 76) if number not in hall.called]
+            number = rng.choice(remaining)
+            start = time.perf_counter()
+            winners = hall.call(number)
+            latencies.append(time.perf_counter() - start)
+            if len(winners) or len(remaining) == 1:
+                games += 1
+                hall.reset()
+    finally:
+        hall.close()
+    if latencies:
+        latencies.sort()
+        print(f"{len(latencies)} calls over {games} finished games: "
+              f"mean {sum(latencies) / len(latencies) * 1000:.2f} ms, "
+              f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+              f"max {latencies[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
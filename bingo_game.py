@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import messagebox
 import random
 
+from bingo_hall import CELL_LINES, LINE_COUNT
+
 class BingoGame:
     def __init__(self, root):
         self.root = root
@@ -23,6 +25,7 @@ class BingoGame:
         # Game state
         self.numbers = []
         self.marked = set()
+        self.line_counts = [0] * LINE_COUNT  # Marked cells per line
         self.bingo_count = 0
         self.game_over = False
         
@@ -115,6 +118,7 @@ class BingoGame:
         # Reset game state
         self.numbers = random.sample(range(1, 26), 25)
         self.marked = set()
+        self.line_counts = [0] * LINE_COUNT
         self.bingo_count = 0
         self.game_over = False
         
@@ -146,32 +150,19 @@ class BingoGame:
                 bg=self.colors['marked'],
                 fg='white'
             )
+            # Only the lines through this cell can change
+            for line in CELL_LINES[row * 5 + col]:
+                self.line_counts[line] += 1
+                if self.line_counts[line] == 5:
+                    self.bingo_count += 1
             self.check_bingo()
     
     def check_bingo(self):
-        bingo_count = 0
-        
-        # Check rows
-        for i in range(5):
-            if all(self.numbers[i * 5 + j] in self.marked for j in range(5)):
-                bingo_count += 1
-        
-        # Check columns
-        for j in range(5):
-            if all(self.numbers[i * 5 + j] in self.marked for i in range(5)):
-                bingo_count += 1
-        
-        # Check diagonals
-        if all(self.numbers[i * 5 + i] in self.marked for i in range(5)):
-            bingo_count += 1
-        if all(self.numbers[i * 5 + (4 - i)] in self.marked for i in range(5)):
-            bingo_count += 1
-        
-        self.bingo_count = bingo_count
+        # bingo_count is kept up to date by mark_number
         self.update_bingo_display()
         
         # Check for win
-        if bingo_count >= 5:
+        if self.bingo_count >= 5:
             self.game_over = True
             messagebox.showinfo("Congratulations!", "BINGO! You've won the game!")
     
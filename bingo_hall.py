@@ -0,0 +1,325 @@
+import argparse
+import random
+import time
+from array import array
+
+# Lines on a 5x5 card: rows 0-4, columns 5-9, diagonal 10 and anti-diagonal 11.
+# CELL_LINES[i] lists the lines through cell i = row * 5 + col.
+LINE_COUNT = 12
+CELL_LINES = tuple(
+    (i // 5, 5 + i % 5)
+    + ((10,) if i // 5 == i % 5 else ())
+    + ((11,) if i // 5 + i % 5 == 4 else ())
+    for i in range(25)
+)
+# LINE_MASKS[line] has bit i set for each cell i on the line
+LINE_MASKS = tuple(sum(1 << i for i in range(25) if line in CELL_LINES[i])
+                   for line in range(LINE_COUNT))
+
+# Card number used for the free centre cell, which starts out daubed
+FREE = 0
+# Card number filling the cells of a removed card; it is never called
+REMOVED = 255
+
+
+def random_card(rng=random):
+    # A standard 75-ball card in row-major order: column B holds 1-15,
+    # I 16-30, N 31-45, G 46-60 and O 61-75, with a free centre
+    columns = [rng.sample(range(15 * col + 1, 15 * col + 16), 5) for col in range(5)]
+    card = [columns[col][row] for row in range(5) for col in range(5)]
+    card[12] = FREE
+    return card
+
+
+class BingoHall:
+    # Headless engine for many cards at once. Card state lives in flat
+    # arrays indexed by card id, and an inverted index maps every number to
+    # the (card, cell) positions holding it, so a call only touches the
+    # cards that contain the called number.
+    #
+    # With track_one_away, a second index keeps, for every uncalled number,
+    # the cards that would win if it were called next. A card's entries
+    # only change when one of its lines reaches four or five daubs, so a
+    # call updates just the touched cards where that happened, and the
+    # call's winners are read straight from the index. Keeping it costs
+    # each call up to twice as much, so it is off unless asked for.
+
+    def __init__(self, lines_required=1, track_one_away=False):
+        self.lines_required = lines_required
+        self.track_one_away = track_one_away
+        self.numbers = array("B")  # 25 per card
+        self.daubs = array("I")  # Bit i set when cell i is daubed
+        self.line_counts = bytearray()  # Daubed cells of each of the 12 lines
+        self.lines_done = bytearray()  # Completed lines per card
+        self.index = {}  # number -> array of card * 25 + cell
+        self.called = []
+        self.called_set = set()
+        self.winners = []
+        self.waiting = {}  # number -> set of cards it would complete
+        self.waiting_for = {}  # card -> numbers that would complete it
+        self.free = []  # Ids of removed cards, reused by add_card
+
+    @property
+    def card_count(self):
+        # Card ids in use or free for reuse
+        return len(self.daubs)
+
+    def add_card(self, numbers):
+        if self.free:
+            card = self.free.pop()
+            self.numbers[card * 25:card * 25 + 25] = array("B", numbers)
+            self.daubs[card] = 0
+            self.line_counts[card * LINE_COUNT:(card + 1) * LINE_COUNT] = bytes(LINE_COUNT)
+            self.lines_done[card] = 0
+        else:
+            card = len(self.daubs)
+            self.numbers.extend(numbers)
+            self.daubs.append(0)
+            self.line_counts.extend(bytes(LINE_COUNT))
+            self.lines_done.append(0)
+        for cell, number in enumerate(numbers):
+            if number == FREE:
+                self._daub(card, cell)
+            else:
+                positions = self.index.get(number)
+                if positions is None:
+                    positions = self.index[number] = array("I")
+                positions.append(card * 25 + cell)
+                if number in self.called_set:
+                    self._daub(card, cell)
+        return card
+
+    def add_cards(self, cards):
+        for numbers in cards:
+            self.add_card(numbers)
+
+    def remove_cards(self, cards):
+        # Take cards out of play and free their ids for later add_card calls.
+        # This is one pass over the whole index, so remove cards in batches.
+        cards = set(cards)
+        if not cards:
+            return
+        for number, positions in self.index.items():
+            self.index[number] = array("I", [position for position in positions
+                                             if position // 25 not in cards])
+        for card in cards:
+            for number in self.waiting_for.pop(card, ()):
+                waiting = self.waiting[number]
+                waiting.discard(card)
+                if not waiting:
+                    del self.waiting[number]
+            self.numbers[card * 25:card * 25 + 25] = array("B", [REMOVED] * 25)
+            self.daubs[card] = 0
+            self.line_counts[card * LINE_COUNT:(card + 1) * LINE_COUNT] = bytes(LINE_COUNT)
+            self.lines_done[card] = 0
+        self.winners = [card for card in self.winners if card not in cards]
+        # Lowest ids are reused first
+        self.free = sorted(set(self.free) | cards, reverse=True)
+
+    def card(self, card):
+        return list(self.numbers[card * 25:card * 25 + 25])
+
+    def _daub(self, card, cell):
+        self.daubs[card] |= 1 << cell
+        base = card * LINE_COUNT
+        for line in CELL_LINES[cell]:
+            self.line_counts[base + line] += 1
+            if self.line_counts[base + line] == 5:
+                self.lines_done[card] += 1
+                if self.lines_done[card] == self.lines_required:
+                    self.winners.append(card)
+                if self.track_one_away:
+                    self._line_done(card)
+            elif self.line_counts[base + line] == 4 and self.track_one_away:
+                self._line_waiting(card, line)
+
+    def _line_waiting(self, card, line):
+        # A line of card reached four daubs, so the number in its missing
+        # cell may now complete the card. Waiting numbers are never lost
+        # until the card wins: more daubs only bring it closer.
+        need = self.lines_required - self.lines_done[card]
+        if need <= 0:
+            return
+        missing = LINE_MASKS[line] & ~self.daubs[card]
+        if not missing:
+            # Mid-call, the line's last cell is daubed before its count is
+            # raised to five; it waits for nothing
+            return
+        cell = missing.bit_length() - 1
+        if need > 1:
+            base = card * LINE_COUNT
+            if sum(self.line_counts[base + other] == 4 for other in CELL_LINES[cell]) < need:
+                return
+        number = self.numbers[card * 25 + cell]
+        numbers = self.waiting_for.get(card)
+        if numbers is None:
+            numbers = self.waiting_for[card] = []
+        elif number in numbers:
+            return
+        numbers.append(number)
+        cards = self.waiting.get(number)
+        if cards is None:
+            cards = self.waiting[number] = set()
+        cards.add(card)
+
+    def _line_done(self, card):
+        # A line of card was completed: a winner waits for nothing, and a
+        # card needing more lines may now be completed by other numbers
+        for number in self.waiting_for.pop(card, ()):
+            cards = self.waiting[number]
+            cards.discard(card)
+            if not cards:
+                del self.waiting[number]
+        if self.lines_done[card] < self.lines_required:
+            self._refresh_waiting(card)
+
+    def _refresh_waiting(self, card):
+        # Find every number card is waiting on from scratch
+        base = card * LINE_COUNT
+        for line in range(LINE_COUNT):
+            if self.line_counts[base + line] == 4:
+                self._line_waiting(card, line)
+
+    def call(self, number):
+        # Daub number on every card holding it and return the cards that
+        # became winners with this call
+        if number in self.called_set:
+            return []
+        self.called.append(number)
+        self.called_set.add(number)
+        if self.track_one_away:
+            new_winners = self._call_tracked(number)
+        else:
+            new_winners = self._call(number)
+        self.winners.extend(new_winners)
+        return new_winners
+
+    def _call(self, number):
+        daubs = self.daubs
+        counts = self.line_counts
+        done = self.lines_done
+        required = self.lines_required
+        new_winners = []
+        for position in self.index.get(number, ()):
+            card, cell = divmod(position, 25)
+            daubs[card] |= 1 << cell
+            base = card * LINE_COUNT
+            for line in CELL_LINES[cell]:
+                counts[base + line] += 1
+                if counts[base + line] == 5:
+                    done[card] += 1
+                    if done[card] == required:
+                        new_winners.append(card)
+        return new_winners
+
+    def _call_tracked(self, number):
+        # The cards waiting on this number are exactly the new winners
+        new_winners = sorted(self.waiting.get(number, ()))
+        daubs = self.daubs
+        counts = self.line_counts
+        done = self.lines_done
+        required = self.lines_required
+        line_done = self._line_done
+        line_waiting = self._line_waiting
+        for position in self.index.get(number, ()):
+            card, cell = divmod(position, 25)
+            daubs[card] |= 1 << cell
+            base = card * LINE_COUNT
+            for line in CELL_LINES[cell]:
+                counts[base + line] += 1
+                if counts[base + line] == 5:
+                    done[card] += 1
+                    if done[card] <= required:
+                        line_done(card)
+                elif counts[base + line] == 4 and done[card] < required:
+                    line_waiting(card, line)
+        return new_winners
+
+    def _check_tracking(self):
+        if not self.track_one_away:
+            raise ValueError("one-away tracking is off; create the hall with "
+                             "track_one_away=True")
+
+    @property
+    def one_away_count(self):
+        # Cards that the right next call would make winners
+        self._check_tracking()
+        return len(self.waiting_for)
+
+    def one_away(self, number):
+        # Cards that would win if number were called next
+        self._check_tracking()
+        return self.waiting.get(number, frozenset())
+
+    def one_away_numbers(self):
+        # {number: cards it would complete} over the uncalled numbers
+        self._check_tracking()
+        return {number: len(cards) for number, cards in self.waiting.items()}
+
+    def is_winner(self, card):
+        return self.lines_done[card] >= self.lines_required
+
+    def check_claim(self, card):
+        # Verify a claim from the card's numbers and the called numbers alone,
+        # independently of the incremental counters
+        if card in self.free:
+            return False
+        numbers = self.card(card)
+        daubed = [number == FREE or number in self.called_set for number in numbers]
+        counts = [0] * LINE_COUNT
+        for cell, is_daubed in enumerate(daubed):
+            if is_daubed:
+                for line in CELL_LINES[cell]:
+                    counts[line] += 1
+        return sum(count == 5 for count in counts) >= self.lines_required
+
+    def reset(self):
+        # Start a new game with the same cards
+        self.called = []
+        self.called_set = set()
+        self.winners = []
+        self.waiting = {}
+        self.waiting_for = {}
+        self.daubs = array("I", bytes(4 * len(self.daubs)))
+        self.line_counts = bytearray(len(self.line_counts))
+        self.lines_done = bytearray(len(self.lines_done))
+        free = set(self.free)
+        for card in range(len(self.daubs)):
+            if card not in free and self.numbers[card * 25 + 12] == FREE:
+                self._daub(card, 12)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a headless bingo hall")
+    parser.add_argument("--cards", type=int, default=100000)
+    parser.add_argument("--lines", type=int, default=1, help="lines needed to win")
+    parser.add_argument("--one-away", action="store_true",
+                        help="also track the cards one number from winning")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    hall = BingoHall(args.lines, args.one_away)
+    hall.add_cards(random_card(rng) for _ in range(args.cards))
+    print(f"Loaded {args.cards} cards in {time.perf_counter() - start:.2f} s")
+
+    calls = rng.sample(range(1, 76), 75)
+    start = time.perf_counter()
+    for count, number in enumerate(calls, 1):
+        winners = hall.call(number)
+        if winners:
+            break
+    elapsed = time.perf_counter() - start
+    verified = all(hall.check_claim(card) for card in winners)
+    print(f"First winners after {count} calls: {len(winners)} card(s), "
+          f"{'verified' if verified else 'NOT verified'}; "
+          f"{elapsed / count * 1000:.2f} ms per call")
+    if args.one_away:
+        needed = sorted(hall.one_away_numbers().items(), key=lambda item: -item[1])
+        print(f"{hall.one_away_count} cards one away; most wanted: "
+              + ", ".join(f"{number} ({cards})" for number, cards in needed[:5]))
+
+
+if __name__ == "__main__":
+    main()
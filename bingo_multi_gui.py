@@ -0,0 +1,261 @@
+import argparse
+import random
+import tkinter as tk
+
+from bingo_hall import BingoHall, FREE, LINE_COUNT, random_card
+
+CELL_SIZE = 30
+HEADER = 24
+GAP = 16
+CARD_WIDTH = 5 * CELL_SIZE
+CARD_HEIGHT = HEADER + 5 * CELL_SIZE
+CALL_INTERVAL_MS = 1000
+
+
+class MultiCardBingo:
+    # Many auto-daubed cards on one scrolling canvas. Canvas items exist
+    # only for the cards in view: they are created as cards scroll in and
+    # deleted as they scroll out. A call recolours just the cells holding
+    # the number on visible cards, and every card's distance to a win is
+    # updated only when one of its cells is daubed.
+
+    def __init__(self, root, cards=60, columns=4, interval_ms=CALL_INTERVAL_MS, seed=None):
+        self.root = root
+        self.root.title("Bingo - Multi Card")
+        self.card_count = cards
+        self.columns = columns
+        self.interval_ms = interval_ms
+        self.rng = random.Random(seed)
+
+        self.colors = {
+            'bg': '#f0f2f5',
+            'card_bg': '#ffffff',
+            'accent': '#4a90e2',
+            'button': '#5c6bc0',
+            'button_hover': '#7986cb',
+            'text': '#2c3e50',
+            'marked': '#4caf50',
+            'free': '#a5d6a7',
+            'closest': '#ff9800',
+            'shadow': '#b0bec5'
+        }
+
+        self.hall = None
+        self.remaining = []
+        self.need = []  # Cells each card still needs for a win
+        self.closest = set()
+        self.visible = {}  # card -> (frame, header, cell rectangles, cell texts)
+        self.calling = False
+        self.pending = None
+        self.game_over = False
+
+        self.setup_gui()
+        self.new_game()
+
+    def setup_gui(self):
+        self.root.configure(bg=self.colors['bg'])
+
+        top = tk.Frame(self.root, bg=self.colors['bg'], padx=20, pady=10)
+        top.pack(fill='x')
+        tk.Label(top, text="BINGO", font=('Helvetica', 28, 'bold'),
+                 bg=self.colors['bg'], fg=self.colors['accent']).pack(side='left')
+
+        button_style = dict(font=('Helvetica', 12, 'bold'), bg=self.colors['button'],
+                            fg='white', activebackground=self.colors['button_hover'],
+                            activeforeground='white', relief='flat', cursor='hand2',
+                            padx=15, pady=6)
+        tk.Button(top, text="New Game", command=self.new_game,
+                  **button_style).pack(side='right', padx=5)
+        self.start_button = tk.Button(top, text="Start", command=self.toggle_calling,
+                                      **button_style)
+        self.start_button.pack(side='right', padx=5)
+
+        self.status_label = tk.Label(self.root, font=('Helvetica', 14, 'bold'),
+                                     bg=self.colors['bg'], fg=self.colors['text'])
+        self.status_label.pack(fill='x', padx=20)
+
+        body = tk.Frame(self.root, bg=self.colors['bg'])
+        body.pack(expand=True, fill='both', padx=20, pady=10)
+        rows = (self.card_count + self.columns - 1) // self.columns
+        width = self.columns * (CARD_WIDTH + GAP) + GAP
+        self.canvas = tk.Canvas(body, width=width, height=3 * (CARD_HEIGHT + GAP) + GAP,
+                                bg=self.colors['bg'], highlightthickness=0,
+                                scrollregion=(0, 0, width, rows * (CARD_HEIGHT + GAP) + GAP))
+        self.scrollbar = tk.Scrollbar(body, orient='vertical', command=self.canvas.yview)
+        # Tk reports every change of the view here: scrolling, resizing and
+        # the first layout all end up creating the cards that came into view
+        self.canvas.configure(yscrollcommand=self.view_changed)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas.pack(side='left', expand=True, fill='both')
+        self.canvas.bind("<MouseWheel>", self.wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+
+    def wheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def view_changed(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh_visible()
+
+    def card_origin(self, card):
+        row, col = divmod(card, self.columns)
+        return GAP + col * (CARD_WIDTH + GAP), GAP + row * (CARD_HEIGHT + GAP)
+
+    def refresh_visible(self):
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first_row = max(0, int(top // (CARD_HEIGHT + GAP)))
+        last_row = int(bottom // (CARD_HEIGHT + GAP))
+        wanted = range(first_row * self.columns,
+                       min(self.card_count, (last_row + 1) * self.columns))
+        for card in [card for card in self.visible if card not in wanted]:
+            frame, header, rects, texts = self.visible.pop(card)
+            self.canvas.delete(frame, header, *rects, *texts)
+        for card in wanted:
+            if card not in self.visible:
+                self.draw_card(card)
+
+    def draw_card(self, card):
+        x, y = self.card_origin(card)
+        frame = self.canvas.create_rectangle(
+            x - 3, y - 3, x + CARD_WIDTH + 3, y + CARD_HEIGHT + 3,
+            fill=self.colors['card_bg'], **self.frame_style(card))
+        header = self.canvas.create_text(
+            x + CARD_WIDTH / 2, y + HEADER / 2, text=self.header_text(card),
+            font=('Helvetica', 10, 'bold'), fill=self.colors['text'])
+        numbers = self.hall.card(card)
+        daubs = self.hall.daubs[card]
+        rects = []
+        texts = []
+        for cell, number in enumerate(numbers):
+            cx = x + cell % 5 * CELL_SIZE
+            cy = y + HEADER + cell // 5 * CELL_SIZE
+            marked = daubs >> cell & 1
+            rects.append(self.canvas.create_rectangle(
+                cx, cy, cx + CELL_SIZE, cy + CELL_SIZE, outline=self.colors['shadow'],
+                fill=self.cell_color(number, marked)))
+            texts.append(self.canvas.create_text(
+                cx + CELL_SIZE / 2, cy + CELL_SIZE / 2,
+                text="FREE" if number == FREE else str(number),
+                font=('Helvetica', 7 if number == FREE else 10, 'bold'),
+                fill='white' if marked else self.colors['text']))
+        self.visible[card] = (frame, header, rects, texts)
+
+    def cell_color(self, number, marked):
+        if not marked:
+            return self.colors['card_bg']
+        return self.colors['free'] if number == FREE else self.colors['marked']
+
+    def frame_style(self, card):
+        if card in self.closest:
+            return dict(outline=self.colors['closest'], width=3)
+        return dict(outline=self.colors['shadow'], width=1)
+
+    def header_text(self, card):
+        if self.need[card] == 0:
+            return f"Card {card + 1} - BINGO!"
+        return f"Card {card + 1} - needs {self.need[card]}"
+
+    def card_need(self, card):
+        # Fewest cells still needed to complete the required lines
+        base = card * LINE_COUNT
+        missing = sorted(5 - count for count in self.hall.line_counts[base:base + LINE_COUNT])
+        return sum(missing[:self.hall.lines_required])
+
+    def new_game(self):
+        self.cancel_call()
+        self.hall = BingoHall(track_one_away=True)
+        self.hall.add_cards(random_card(self.rng) for _ in range(self.card_count))
+        self.remaining = self.rng.sample(range(1, 76), 75)
+        self.need = [self.card_need(card) for card in range(self.card_count)]
+        self.closest = set()
+        self.game_over = False
+        for frame, header, rects, texts in self.visible.values():
+            self.canvas.delete(frame, header, *rects, *texts)
+        self.visible = {}
+        self.update_closest()
+        self.refresh_visible()
+        self.status_label.config(text=f"{self.card_count} cards - press Start")
+        if self.calling:
+            self.schedule_call()
+
+    def toggle_calling(self):
+        self.calling = not self.calling
+        self.start_button.config(text="Pause" if self.calling else "Start")
+        if self.calling:
+            self.schedule_call()
+        else:
+            self.cancel_call()
+
+    def schedule_call(self):
+        if self.pending is None and not self.game_over:
+            self.pending = self.root.after(self.interval_ms, self.call_number)
+
+    def cancel_call(self):
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+            self.pending = None
+
+    def call_number(self):
+        self.pending = None
+        if not self.calling or self.game_over or not self.remaining:
+            return
+        number = self.remaining.pop()
+        winners = self.hall.call(number)
+
+        touched = set()
+        for position in self.hall.index.get(number, ()):
+            card, cell = divmod(position, 25)
+            touched.add(card)
+            items = self.visible.get(card)
+            if items is not None:
+                self.canvas.itemconfig(items[2][cell], fill=self.colors['marked'])
+                self.canvas.itemconfig(items[3][cell], fill='white')
+        for card in touched:
+            need = self.card_need(card)
+            if need != self.need[card]:
+                self.need[card] = need
+                if card in self.visible:
+                    self.canvas.itemconfig(self.visible[card][1], text=self.header_text(card))
+        self.update_closest()
+
+        called = f"{'BINGO'[(number - 1) // 15]}-{number}"
+        if winners:
+            self.game_over = True
+            cards = ", ".join(str(card + 1) for card in winners)
+            self.status_label.config(text=f"{called} - BINGO on card {cards}!")
+        else:
+            self.status_label.config(
+                text=f"Called {called} ({len(self.hall.called)} of 75) - "
+                     f"closest cards need {min(self.need)}, "
+                     f"{self.hall.one_away_count} one away")
+            self.schedule_call()
+
+    def update_closest(self):
+        # Highlight the cards needing the fewest cells, restyling only the
+        # visible cards whose highlight changed
+        best = min(self.need)
+        closest = {card for card, need in enumerate(self.need) if need == best}
+        changed = closest ^ self.closest
+        self.closest = closest
+        for card in changed:
+            if card in self.visible:
+                self.canvas.itemconfig(self.visible[card][0], **self.frame_style(card))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many bingo cards at once")
+    parser.add_argument("--cards", type=int, default=60)
+    parser.add_argument("--columns", type=int, default=4, help="cards per row")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between calls")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    game = MultiCardBingo(root, args.cards, args.columns, int(args.interval * 1000), args.seed)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import time
+from math import comb
+
+import numpy as np
+
+from bingo_bitmask import count_lines
+from bingo_hall import LINE_COUNT
+
+# Exact odds for a 5x5 card, found by counting every one of the 2^25 sets
+# of marked cells. counts[m][t] is the number of sets of m marked cells
+# that complete exactly t lines. If the cells are marked in a uniformly
+# random order, the first m marks are a uniformly random m-set, so
+#
+#   P(t or more lines after m marks) = sum(counts[m][t:]) / C(25, m)
+#
+# and the distribution of the marks needed to reach t lines follows from
+# it. The same counts restricted to sets containing the centre give the
+# odds for a card with a free centre.
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bingo_odds.json")
+CENTRE_BIT = 1 << 12
+CHUNK_BITS = 20
+
+# Set bits of every 16-bit value; np.bitwise_count needs NumPy 2.0
+POPCOUNT16 = np.array([bin(value).count("1") for value in range(1 << 16)], dtype=np.uint8)
+
+
+def popcount(masks):
+    # Set bits of each uint32 mask in masks, a half at a time
+    return POPCOUNT16[masks & 0xFFFF] + POPCOUNT16[masks >> 16]
+
+
+def count_mark_sets():
+    # Histograms of (marks, lines) over all masks and over the masks with
+    # the centre marked, as two (26, LINE_COUNT + 1) integer arrays
+    width = LINE_COUNT + 1
+    all_sets = np.zeros(26 * width, dtype=np.int64)
+    free_sets = np.zeros(26 * width, dtype=np.int64)
+    chunk = 1 << CHUNK_BITS
+    for start in range(0, 1 << 25, chunk):
+        masks = np.arange(start, start + chunk, dtype=np.uint32)
+        keys = popcount(masks).astype(np.int64) * width + count_lines(masks)
+        all_sets += np.bincount(keys, minlength=26 * width)
+        free_sets += np.bincount(keys[(masks & CENTRE_BIT) != 0], minlength=26 * width)
+    return all_sets.reshape(26, width), free_sets.reshape(26, width)
+
+
+def load_counts(path=CACHE_PATH):
+    # The histograms, read from the cache file or counted and saved there
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return np.array(data["all"], dtype=np.int64), np.array(data["free"], dtype=np.int64)
+    except (OSError, ValueError, KeyError):
+        pass
+    all_sets, free_sets = count_mark_sets()
+    with open(path, "w") as f:
+        json.dump({"all": all_sets.tolist(), "free": free_sets.tolist()}, f)
+    return all_sets, free_sets
+
+
+def reached_by_marks(lines=5, free_centre=False, counts=None):
+    # reached[m] = P(at least `lines` lines are complete after m random
+    # marks). With a free centre, m counts the player's marks only (0-24).
+    all_sets, free_sets = counts if counts is not None else load_counts()
+    if free_centre:
+        hits = free_sets[1:, lines:].sum(axis=1)
+        return np.array([hits[m] / comb(24, m) for m in range(25)])
+    hits = all_sets[:, lines:].sum(axis=1)
+    return np.array([hits[m] / comb(25, m) for m in range(26)])
+
+
+def reached_by_calls(lines=1, balls=75, counts=None):
+    # reached[c] = P(at least `lines` lines are complete after c numbers are
+    # called) for a free-centre card holding 24 of `balls` numbers. The
+    # cells hit by c calls are hypergeometric, and given j hits they are a
+    # uniformly random j-set of the 24.
+    by_marks = reached_by_marks(lines, free_centre=True, counts=counts)
+    reached = np.zeros(balls + 1)
+    for calls in range(balls + 1):
+        total = comb(balls, calls)
+        for hits in range(max(0, calls - balls + 24), min(24, calls) + 1):
+            weight = comb(24, hits) * comb(balls - 24, calls - hits) / total
+            reached[calls] += weight * by_marks[hits]
+    return reached
+
+
+def stop_distribution(reached):
+    # P(the threshold is first reached at step n) from the cumulative odds
+    return np.diff(reached, prepend=0.0)
+
+
+def summary(reached):
+    # Expected, median and 90th percentile number of steps
+    steps = np.arange(len(reached))
+    expected = float((steps * stop_distribution(reached)).sum())
+    median = int(np.searchsorted(reached, 0.5))
+    p90 = int(np.searchsorted(reached, 0.9))
+    return expected, median, p90
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact odds of completing bingo lines")
+    parser.add_argument("--lines", type=int, default=5,
+                        help="show the full distribution for this many lines")
+    parser.add_argument("--free-centre", action="store_true",
+                        help="the centre cell starts marked")
+    parser.add_argument("--calls", type=int, metavar="BALLS",
+                        help="count numbers called from BALLS balls instead of marks "
+                             "(implies a free centre)")
+    parser.add_argument("--recount", action="store_true", help="ignore the cache file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.recount:
+        counts = count_mark_sets()
+    else:
+        counts = load_counts()
+    print(f"Mark-set histograms ready in {time.perf_counter() - start:.2f} s")
+
+    def reached(lines):
+        if args.calls:
+            return reached_by_calls(lines, args.calls, counts)
+        return reached_by_marks(lines, args.free_centre, counts)
+
+    step = "calls" if args.calls else "marks"
+    print(f"\nLines  expected {step}  median  90th pct")
+    for lines in range(1, LINE_COUNT + 1):
+        expected, median, p90 = summary(reached(lines))
+        print(f"{lines:5}  {expected:14.3f}  {median:6}  {p90:8}")
+
+    cumulative = reached(args.lines)
+    print(f"\n{step.capitalize():>5}  P(first reach {args.lines} lines)  P(reached by then)")
+    for n, p in enumerate(stop_distribution(cumulative)):
+        if p > 0:
+            print(f"{n:5}  {p:27.6f}  {cumulative[n]:18.6f}")
+
+
+if __name__ == "__main__":
+    main()
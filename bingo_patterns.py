@@ -0,0 +1,162 @@
+import argparse
+import time
+
+import numpy as np
+
+from bingo_bitmask import BingoCardArray, random_cards
+
+# Prize patterns are drawn as pictures of rows, "X" for a cell that must be
+# daubed. A picture smaller than the card can be allowed anywhere on it
+# (translate) and in all four orientations (rotate); every allowed
+# placement is compiled to its own 25-bit mask, so matching a pattern is
+# "does the daub mask cover any of these masks".
+
+PATTERNS = {}  # name -> tuple of masks
+
+
+def _picture_cells(picture):
+    rows = picture.split()
+    return {(row, col) for row, line in enumerate(rows)
+            for col, mark in enumerate(line) if mark == "X"}
+
+
+def _placements(cells, translate, rotate):
+    shapes = [cells]
+    if rotate:
+        for _ in range(3):
+            shapes.append({(col, 4 - row) for row, col in shapes[-1]})
+    for shape in shapes:
+        # Normalise to the top-left corner before translating, so pictures
+        # can be drawn anywhere within the 5x5 grid
+        if translate:
+            top = min(row for row, _ in shape)
+            left = min(col for _, col in shape)
+            shape = {(row - top, col - left) for row, col in shape}
+            height = max(row for row, _ in shape) + 1
+            width = max(col for _, col in shape) + 1
+            offsets = [(dr, dc) for dr in range(6 - height) for dc in range(6 - width)]
+        else:
+            offsets = [(0, 0)]
+        for dr, dc in offsets:
+            yield sum(1 << ((row + dr) * 5 + col + dc) for row, col in shape)
+
+
+def compile_pattern(*pictures, translate=False, rotate=False):
+    # All distinct masks of the pictures in their allowed placements
+    masks = set()
+    for picture in pictures:
+        masks.update(_placements(_picture_cells(picture), translate, rotate))
+    return tuple(sorted(masks))
+
+
+def register(name, *pictures, translate=False, rotate=False):
+    PATTERNS[name] = compile_pattern(*pictures, translate=translate, rotate=rotate)
+    return PATTERNS[name]
+
+
+register("line", "XXXXX", "X.... .X... ..X.. ...X. ....X", translate=True, rotate=True)
+register("four corners", "X...X ..... ..... ..... X...X")
+register("letter X", "X...X .X.X. ..X.. .X.X. X...X")
+register("postage stamp", "XX... XX... ..... ..... .....", rotate=True)
+register("picture frame", "XXXXX X...X X...X X...X XXXXX")
+register("blackout", "XXXXX XXXXX XXXXX XXXXX XXXXX")
+
+
+class PrizeTiers:
+    # The patterns paid in one game, each a prize tier. All their masks are
+    # kept in one flat array with the tier bit of each, so a card is
+    # checked against every active pattern in a single pass.
+
+    def __init__(self, names):
+        self.names = list(names)
+        if len(self.names) > 32:
+            raise ValueError("at most 32 prize tiers")
+        masks = []
+        tier_bits = []
+        for tier, name in enumerate(self.names):
+            if name not in PATTERNS:
+                raise KeyError(f"unknown pattern {name!r}")
+            masks.extend(PATTERNS[name])
+            tier_bits.extend([1 << tier] * len(PATTERNS[name]))
+        self.masks = np.array(masks, dtype=np.uint32)
+        self.tier_bits = np.array(tier_bits, dtype=np.uint32)
+        self._pairs = list(zip(masks, tier_bits))
+
+    def match(self, daub):
+        # Bitmask of the tiers whose pattern the daub mask covers
+        matched = 0
+        for mask, bit in self._pairs:
+            if daub & mask == mask:
+                matched |= bit
+        return matched
+
+    def match_many(self, daubs):
+        # match() for every daub mask in an array
+        covered = (daubs[:, None] & self.masks) == self.masks
+        return np.bitwise_or.reduce(np.where(covered, self.tier_bits, np.uint32(0)), axis=1)
+
+    def tier_names(self, matched):
+        return [name for tier, name in enumerate(self.names) if matched >> tier & 1]
+
+
+class PrizeHall:
+    # A BingoCardArray paying several tiers at once. Each call only
+    # re-checks the cards it daubed, and reports the cards that completed a
+    # tier for the first time.
+
+    def __init__(self, numbers, tiers):
+        self.cards = BingoCardArray(numbers)
+        self.tiers = tiers if isinstance(tiers, PrizeTiers) else PrizeTiers(tiers)
+        self.won = np.zeros(self.cards.card_count, dtype=np.uint32)
+
+    def reset(self):
+        self.cards.reset()
+        self.won[:] = 0
+
+    def call(self, number):
+        # {tier name: array of card ids} for tiers completed on this call
+        touched = self.cards.daub(number)
+        matched = self.tiers.match_many(self.cards.daubs[touched])
+        new = matched & ~self.won[touched]
+        self.won[touched] |= matched
+        winners = {}
+        for tier, name in enumerate(self.tiers.names):
+            hit = touched[(new >> tier & 1).astype(bool)]
+            if len(hit):
+                winners[name] = hit
+        return winners
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-pattern prize matching")
+    parser.add_argument("--cards", type=int, default=200000)
+    parser.add_argument("--tiers", nargs="+", default=list(PATTERNS),
+                        help=f"patterns to pay, from: {', '.join(PATTERNS)}")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    hall = PrizeHall(random_cards(args.cards, rng), args.tiers)
+    print(f"{args.cards} cards, {len(hall.tiers.masks)} pattern masks in "
+          f"{len(hall.tiers.names)} tiers")
+
+    first = {}
+    slowest = 0.0
+    total = 0.0
+    calls = rng.permutation(np.arange(1, 76))
+    for count, number in enumerate(calls, 1):
+        start = time.perf_counter()
+        winners = hall.call(int(number))
+        elapsed = time.perf_counter() - start
+        slowest = max(slowest, elapsed)
+        total += elapsed
+        for name, cards in winners.items():
+            if name not in first:
+                first[name] = count
+                print(f"Call {count:2}: {name} won by {len(cards)} card(s)")
+    print(f"{total / len(calls) * 1000:.2f} ms per call on average, "
+          f"{slowest * 1000:.2f} ms at most")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+import argparse
+import asyncio
+import random
+import time
+
+from bingo_hall import BingoHall, CELL_LINES, LINE_COUNT, FREE, random_card
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Line-based text protocol over TCP.
+#
+# Player to server:
+#   JOIN [n]               deal n cards (default 1) to this player
+#   CLAIM card             claim a win on one of this player's cards
+#
+# Server to player:
+#   CARD card n1 ... n25   a dealt card, row-major, 0 for the free centre
+#   CALLED n1 n2 ...       numbers already called when joining mid-game
+#   GAME g                 game g starts; all cards are cleared
+#   CALL seq number t      number called, sent at time.time_ns() t
+#   VALID card / INVALID card
+#   WINNER card ...        the game is over, won by these cards
+#   ERROR message
+#
+# Every broadcast is encoded once and the same bytes are written to every
+# player. A player whose socket cannot keep up is paused: its requests are
+# not read until its send buffer drains, and it is dropped if the buffer
+# grows past SLOW_PLAYER_LIMIT.
+
+DEFAULT_PORT = 8765
+WRITE_HIGH_WATER = 16 * 1024
+SLOW_PLAYER_LIMIT = 1024 * 1024
+MAX_LINE = 1024
+MAX_CARDS_PER_PLAYER = 100
+GAME_PAUSE = 2.0
+BACKLOG = 4096
+
+
+class PlayerProtocol(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = b""
+        self.cards = set()
+        self.paused = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        self.server.players.add(self)
+
+    def connection_lost(self, exc):
+        self.server.leave(self)
+
+    def pause_writing(self):
+        self.paused = True
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.paused = False
+        self.transport.resume_reading()
+
+    def data_received(self, data):
+        *lines, self.buffer = (self.buffer + data).split(b"\n")
+        if len(self.buffer) > MAX_LINE:
+            self.transport.abort()
+            return
+        for line in lines:
+            self.server.handle(self, line.split())
+
+    def send(self, data):
+        if self.transport.is_closing():
+            return
+        if self.paused and self.transport.get_write_buffer_size() > SLOW_PLAYER_LIMIT:
+            self.server.dropped += 1
+            self.transport.abort()
+            return
+        self.transport.write(data)
+
+
+class BingoServer:
+    # One hall of cards shared by all connected players. The caller loop
+    # runs games back to back; a game ends at the first call after which a
+    # valid claim has been made.
+
+    def __init__(self, interval=1.0, lines_required=1, seed=None):
+        self.interval = interval
+        self.hall = BingoHall(lines_required)
+        self.rng = random.Random(seed)
+        self.players = set()
+        self.game = 0
+        self.sequence = 0
+        self.claims = []
+        self.dropped = 0
+        self.departed = set()  # Cards of players gone since the last game began
+
+    def handle(self, player, parts):
+        try:
+            if not parts:
+                return
+            command = parts[0]
+            if command == b"JOIN":
+                count = int(parts[1]) if len(parts) > 1 else 1
+                self.join(player, max(0, min(count, MAX_CARDS_PER_PLAYER - len(player.cards))))
+            elif command == b"CLAIM":
+                self.claim(player, int(parts[1]))
+            else:
+                player.send(b"ERROR unknown command\n")
+        except (IndexError, ValueError):
+            player.send(b"ERROR bad request\n")
+
+    def join(self, player, count):
+        lines = []
+        for _ in range(count):
+            numbers = random_card(self.rng)
+            card = self.hall.add_card(numbers)
+            player.cards.add(card)
+            lines.append(f"CARD {card} {' '.join(map(str, numbers))}\n")
+        if self.hall.called:
+            lines.append(f"CALLED {' '.join(map(str, self.hall.called))}\n")
+        player.send("".join(lines).encode())
+
+    def leave(self, player):
+        # Cards stay in play until the current game ends, then their ids are
+        # freed for new players
+        self.players.discard(player)
+        self.departed.update(player.cards)
+
+    def claim(self, player, card):
+        # The claim is checked from the card and the called numbers alone
+        valid = card in player.cards and self.hall.check_claim(card)
+        player.send(f"{'VALID' if valid else 'INVALID'} {card}\n".encode())
+        if valid and card not in self.claims:
+            self.claims.append(card)
+
+    def broadcast(self, data):
+        for player in list(self.players):
+            player.send(data)
+
+    async def run_caller(self, games=None):
+        while games is None or self.game < games:
+            self.game += 1
+            self.hall.remove_cards(self.departed)
+            self.departed = set()
+            self.hall.reset()
+            self.claims = []
+            self.broadcast(f"GAME {self.game}\n".encode())
+            for number in self.rng.sample(range(1, 76), 75):
+                await asyncio.sleep(self.interval)
+                if self.claims:
+                    break
+                self.hall.call(number)
+                self.sequence += 1
+                self.broadcast(f"CALL {self.sequence} {number} {time.time_ns()}\n".encode())
+            else:
+                # Give claims on the last number time to arrive
+                await asyncio.sleep(self.interval)
+            self.broadcast(f"WINNER {' '.join(map(str, self.claims))}\n".encode())
+            print(f"Game {self.game}: {len(self.hall.called)} calls, "
+                  f"{len(self.players)} players with "
+                  f"{self.hall.card_count - len(self.hall.free)} cards, "
+                  f"{len(self.claims)} winning cards")
+            await asyncio.sleep(GAME_PAUSE)
+
+
+async def serve(host, port, interval, lines_required, games, seed):
+    bingo = BingoServer(interval, lines_required, seed)
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: PlayerProtocol(bingo), host, port,
+                                      backlog=BACKLOG)
+    print(f"Bingo hall listening on {host}:{port}")
+    async with server:
+        await bingo.run_caller(games)
+    if bingo.dropped:
+        print(f"Dropped {bingo.dropped} slow players")
+
+
+class LoadPlayer(asyncio.Protocol):
+    # A simulated player: daubs its cards, claims wins and records how long
+    # each call took to arrive
+
+    def __init__(self, stats, cards, lines_required=1):
+        self.stats = stats
+        self.card_count = cards
+        self.lines_required = lines_required
+        self.transport = None
+        self.buffer = b""
+        self.cells = {}  # number -> [(card, cell)]
+        self.line_counts = {}  # card -> daubed cells of each of the 12 lines
+        self.lines_done = {}
+        self.claimed = set()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.write(f"JOIN {self.card_count}\n".encode())
+
+    def data_received(self, data):
+        *lines, self.buffer = (self.buffer + data).split(b"\n")
+        for line in lines:
+            parts = line.split()
+            if not parts:
+                continue
+            command = parts[0]
+            if command == b"CALL":
+                self.stats.record(int(parts[1]), time.time_ns() - int(parts[3]))
+                self.daub(int(parts[2]))
+            elif command == b"CARD":
+                self.add_card(int(parts[1]), [int(number) for number in parts[2:]])
+            elif command == b"CALLED":
+                for number in parts[1:]:
+                    self.daub(int(number))
+            elif command == b"GAME":
+                self.claimed = set()
+                for card in self.line_counts:
+                    self.line_counts[card] = [0] * LINE_COUNT
+                    self.lines_done[card] = 0
+                self.daub(FREE)
+            elif command == b"VALID":
+                self.stats.valid += 1
+            elif command == b"INVALID":
+                self.stats.invalid += 1
+
+    def add_card(self, card, numbers):
+        self.line_counts[card] = [0] * LINE_COUNT
+        self.lines_done[card] = 0
+        for cell, number in enumerate(numbers):
+            # FREE cells are listed too, so a new game can daub them again
+            self.cells.setdefault(number, []).append((card, cell))
+            if number == FREE:
+                self.daub_cell(card, cell)
+
+    def daub(self, number):
+        for card, cell in self.cells.get(number, ()):
+            self.daub_cell(card, cell)
+
+    def daub_cell(self, card, cell):
+        counts = self.line_counts[card]
+        for line in CELL_LINES[cell]:
+            counts[line] += 1
+            if counts[line] == 5:
+                self.lines_done[card] += 1
+                if self.lines_done[card] == self.lines_required and card not in self.claimed:
+                    self.claimed.add(card)
+                    self.transport.write(f"CLAIM {card}\n".encode())
+
+    def connection_lost(self, exc):
+        self.stats.disconnected += 1
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies = {}  # call sequence -> list of ns
+        self.measuring = False
+        self.valid = 0
+        self.invalid = 0
+        self.disconnected = 0
+
+    def record(self, sequence, latency):
+        if self.measuring:
+            self.latencies.setdefault(sequence, []).append(latency)
+
+    def report(self, players):
+        print(f"{'Call':>5}  {'players':>7}  {'p50 ms':>7}  {'p99 ms':>7}  {'max ms':>7}")
+        everything = []
+        for sequence in sorted(self.latencies):
+            latencies = sorted(self.latencies[sequence])
+            everything.extend(latencies)
+            print(f"{sequence:5}  {len(latencies):7}  "
+                  f"{latencies[len(latencies) // 2] / 1e6:7.2f}  "
+                  f"{latencies[len(latencies) * 99 // 100] / 1e6:7.2f}  "
+                  f"{latencies[-1] / 1e6:7.2f}")
+        if everything:
+            everything.sort()
+            print(f"All calls: p50 {everything[len(everything) // 2] / 1e6:.2f} ms, "
+                  f"p99 {everything[len(everything) * 99 // 100] / 1e6:.2f} ms, "
+                  f"max {everything[-1] / 1e6:.2f} ms over {players} players")
+        print(f"Claims: {self.valid} valid, {self.invalid} invalid; "
+              f"{self.disconnected} disconnected")
+
+
+async def load(host, port, players, cards, calls, lines_required=1, connect_batch=500):
+    loop = asyncio.get_running_loop()
+    stats = LoadStats()
+    transports = []
+    start = time.perf_counter()
+    for first in range(0, players, connect_batch):
+        batch = range(first, min(first + connect_batch, players))
+        connections = await asyncio.gather(*(
+            loop.create_connection(lambda: LoadPlayer(stats, cards, lines_required), host, port)
+            for _ in batch))
+        transports.extend(transport for transport, _ in connections)
+    print(f"Connected {players} players in {time.perf_counter() - start:.2f} s")
+
+    # Measure only once every player is connected, and drop the calls that
+    # were in flight when measuring started and stopped
+    stats.measuring = True
+    while len(stats.latencies) < calls + 2 and stats.disconnected < players:
+        await asyncio.sleep(0.1)
+    stats.measuring = False
+    if stats.latencies:
+        del stats.latencies[min(stats.latencies)]
+    if stats.latencies:
+        del stats.latencies[max(stats.latencies)]
+    for transport in transports:
+        transport.close()
+    stats.report(players)
+
+
+def raise_file_limit():
+    # Every player is a socket, so allow as many open files as the system does
+    if resource is not None:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft != hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bingo hall server and load generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    serve_parser = modes.add_parser("serve", help="run the hall")
+    serve_parser.add_argument("--interval", type=float, default=1.0,
+                              help="seconds between calls")
+    serve_parser.add_argument("--lines", type=int, default=1, help="lines needed to win")
+    serve_parser.add_argument("--games", type=int, help="stop after this many games")
+    serve_parser.add_argument("--seed", type=int)
+
+    load_parser = modes.add_parser("load", help="simulate many players")
+    load_parser.add_argument("--players", type=int, default=10000)
+    load_parser.add_argument("--cards", type=int, default=1, help="cards per player")
+    load_parser.add_argument("--calls", type=int, default=10,
+                             help="calls to measure before disconnecting")
+    load_parser.add_argument("--lines", type=int, default=1,
+                             help="lines the server needs for a win")
+    args = parser.parse_args()
+
+    raise_file_limit()
+    if args.mode == "serve":
+        asyncio.run(serve(args.host, args.port, args.interval, args.lines,
+                          args.games, args.seed))
+    else:
+        asyncio.run(load(args.host, args.port, args.players, args.cards, args.calls,
+                         args.lines))
+
+
+if __name__ == "__main__":
+    main()
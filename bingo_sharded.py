@@ -0,0 +1,166 @@
+import argparse
+import os
+import time
+from multiprocessing import Pipe, Process, shared_memory
+
+import numpy as np
+
+from bingo_bitmask import BingoCardArray, count_lines, random_cards
+
+# A hall split across worker processes, each owning a contiguous range of
+# cards. The card numbers and the daub masks of every game live in shared
+# memory: the coordinator sends each worker only the called numbers, and
+# workers daub their slice of the shared masks in place and reply with the
+# ids of new winners. The coordinator can read any card's daub state
+# directly, without asking a worker.
+
+
+def _worker(conn, numbers_name, daubs_name, card_count, games, start, stop, lines_required):
+    # Workers share the coordinator's resource tracker, so attaching here
+    # does not register the segments a second time; only close() unlinks
+    numbers_segment = shared_memory.SharedMemory(name=numbers_name)
+    daubs_segment = shared_memory.SharedMemory(name=daubs_name)
+    numbers = np.ndarray((card_count, 25), dtype=np.uint8, buffer=numbers_segment.buf)
+    daubs = np.ndarray((games, card_count), dtype=np.uint32, buffer=daubs_segment.buf)
+    first = BingoCardArray(numbers[start:stop], lines_required, daubs[0, start:stop])
+    halls = [first] + [first.share(daubs[game, start:stop]) for game in range(1, games)]
+    conn.send("ready")
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == "call":
+                conn.send([halls[game].call(number) + start for game, number in message[1]])
+            elif message[0] == "reset":
+                halls[message[1]].reset()
+                conn.send(None)
+            else:
+                break
+    finally:
+        # The views must go before the segments can be closed
+        del numbers, daubs, first, halls
+        numbers_segment.close()
+        daubs_segment.close()
+        conn.close()
+
+
+class ShardedHall:
+    # Several concurrent games over one set of cards, sharded by card range
+    # across worker processes
+
+    def __init__(self, numbers, workers=4, games=1, lines_required=1):
+        numbers = np.asarray(numbers, dtype=np.uint8).reshape(-1, 25)
+        self.card_count = len(numbers)
+        self.games = games
+        self.lines_required = lines_required
+
+        self.numbers_segment = shared_memory.SharedMemory(create=True, size=max(1, numbers.nbytes))
+        np.ndarray(numbers.shape, dtype=np.uint8, buffer=self.numbers_segment.buf)[:] = numbers
+        self.daubs_segment = shared_memory.SharedMemory(
+            create=True, size=max(1, games * self.card_count * 4))
+        self.daubs = np.ndarray((games, self.card_count), dtype=np.uint32,
+                                buffer=self.daubs_segment.buf)
+
+        bounds = np.linspace(0, self.card_count, workers + 1).astype(int)
+        self.connections = []
+        self.processes = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent, child = Pipe()
+            process = Process(target=_worker, daemon=True,
+                              args=(child, self.numbers_segment.name, self.daubs_segment.name,
+                                    self.card_count, games, int(start), int(stop),
+                                    lines_required))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        for conn in self.connections:
+            conn.recv()
+
+    def call_round(self, calls):
+        # Call one number in each of several games at once; calls is a list
+        # of (game, number). Returns the new winners of each call.
+        for conn in self.connections:
+            conn.send(("call", calls))
+        replies = [conn.recv() for conn in self.connections]
+        return [np.concatenate([reply[i] for reply in replies]) for i in range(len(calls))]
+
+    def call(self, game, number):
+        return self.call_round([(game, number)])[0]
+
+    def reset(self, game):
+        for conn in self.connections:
+            conn.send(("reset", game))
+        for conn in self.connections:
+            conn.recv()
+
+    def is_winner(self, game, cards):
+        # Read straight from the shared daub masks
+        return count_lines(self.daubs[game, cards]) >= self.lines_required
+
+    def close(self):
+        for conn in self.connections:
+            conn.send(("stop",))
+        for process in self.processes:
+            process.join()
+        for conn in self.connections:
+            conn.close()
+        del self.daubs
+        for segment in (self.numbers_segment, self.daubs_segment):
+            segment.close()
+            segment.unlink()
+
+
+def make_cards(count, rng, chunk=1 << 19):
+    # random_cards in chunks, to bound the memory of generating millions
+    cards = np.empty((count, 25), dtype=np.uint8)
+    for start in range(0, count, chunk):
+        cards[start:start + chunk] = random_cards(min(chunk, count - start), rng)
+    return cards
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a sharded multi-process bingo hall")
+    parser.add_argument("--cards", type=int, default=2000000)
+    parser.add_argument("--stock", help="load cards from a bingo_cards stock file instead")
+    parser.add_argument("--games", type=int, default=2, help="concurrent games")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rounds", type=int, default=30, help="calls per game to time")
+    parser.add_argument("--lines", type=int, default=1, help="lines needed to win")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.stock:
+        from bingo_cards import CardFile
+        stock = CardFile(args.stock)
+        cards = np.array(stock.cards())
+        stock.close()
+    else:
+        cards = make_cards(args.cards, rng)
+    orders = [rng.permutation(np.arange(1, 76)) for _ in range(args.games)]
+    print(f"{len(cards)} cards, {args.games} concurrent games, {os.cpu_count()} CPUs")
+    print(f"{'Workers':>7}  {'start s':>7}  {'mean ms':>7}  {'p50 ms':>7}  {'max ms':>7}  winners")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        hall = ShardedHall(cards, workers, args.games, args.lines)
+        setup = time.perf_counter() - start
+        try:
+            latencies = []
+            winners = 0
+            for round_ in range(args.rounds):
+                calls = [(game, int(orders[game][round_])) for game in range(args.games)]
+                start = time.perf_counter()
+                results = hall.call_round(calls)
+                latencies.append(time.perf_counter() - start)
+                winners += sum(len(result) for result in results)
+        finally:
+            hall.close()
+        latencies.sort()
+        print(f"{workers:7}  {setup:7.2f}  {sum(latencies) / len(latencies) * 1000:7.2f}  "
+              f"{latencies[len(latencies) // 2] * 1000:7.2f}  {latencies[-1] * 1000:7.2f}  "
+              f"{winners}")
+
+
+if __name__ == "__main__":
+    main()
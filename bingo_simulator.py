@@ -0,0 +1,114 @@
+import argparse
+import time
+
+import numpy as np
+
+from bingo_bitmask import random_cards
+from bingo_hall import CELL_LINES, LINE_COUNT, FREE
+
+# For a fixed call order the call on which a card wins can be read straight
+# off its numbers: a cell is daubed at the rank of its number in the order,
+# a line is complete at the latest rank among its cells, and the card wins
+# at the earliest complete line (the k-th earliest when k lines are needed).
+# No daubing is simulated at all.
+
+# LINE_CELLS[j] lists the five cells of line j
+LINE_CELLS = np.array([[cell for cell in range(25) if line in CELL_LINES[cell]]
+                       for line in range(LINE_COUNT)], dtype=np.intp)
+NEVER = 255  # Rank of a number that is never called
+CHUNK = 1 << 16
+
+
+def call_ranks(order):
+    # rank[number] = 1-based position of number in the call order
+    rank = np.full(256, NEVER, dtype=np.uint8)
+    rank[np.asarray(order)] = np.arange(1, len(order) + 1)
+    rank[FREE] = 0
+    return rank
+
+
+def win_times(cards, order, lines_required=1):
+    # The call on which each card reaches lines_required complete lines
+    # (NEVER if it does not)
+    return _win_times(np.ascontiguousarray(cards.T), call_ranks(order), lines_required)
+
+
+def _win_times(cells, rank, lines_required):
+    # cells is the card stock in cell-major order, shape (25, cards), so each
+    # line is an elementwise maximum of five contiguous rows. Cards are taken
+    # in chunks that stay in cache.
+    count = cells.shape[1]
+    times = np.empty(count, dtype=np.uint8)
+    line_times = np.empty((LINE_COUNT, min(count, CHUNK)), dtype=np.uint8)
+    for start in range(0, count, CHUNK):
+        cell_times = np.take(rank, cells[:, start:start + CHUNK])
+        lines = line_times[:, :cell_times.shape[1]]
+        for line, (a, b, c, d, e) in enumerate(LINE_CELLS):
+            np.maximum(np.maximum(cell_times[a], cell_times[b]),
+                       np.maximum(cell_times[c], cell_times[d]), out=lines[line])
+            np.maximum(lines[line], cell_times[e], out=lines[line])
+        if lines_required == 1:
+            lines.min(axis=0, out=times[start:start + CHUNK])
+        else:
+            times[start:start + CHUNK] = np.partition(
+                lines, lines_required - 1, axis=0)[lines_required - 1]
+    return times
+
+
+def simulate(cards, games, hall_sizes, lines_required=1, rng=None):
+    # Play games random call orders against halls made of the first n cards
+    # for each n in hall_sizes. Returns two (games, len(hall_sizes)) arrays:
+    # the call of the first win and the number of cards winning on it.
+    rng = rng if rng is not None else np.random.default_rng()
+    first = np.empty((games, len(hall_sizes)), dtype=np.uint8)
+    winners = np.empty((games, len(hall_sizes)), dtype=np.int64)
+    ends = np.array(hall_sizes) - 1
+    cells = np.ascontiguousarray(cards[:hall_sizes[-1]].T)
+    for game in range(games):
+        rank = call_ranks(rng.permutation(np.arange(1, 76)))
+        times = _win_times(cells, rank, lines_required)
+        first[game] = np.minimum.accumulate(times)[ends]
+        for i, size in enumerate(hall_sizes):
+            winners[game, i] = np.count_nonzero(times[:size] == first[game, i])
+    return first, winners
+
+
+def print_report(hall_sizes, first, winners, prize):
+    print(f"{'Cards':>9}  {'mean calls':>10}  {'p10':>4}  {'p50':>4}  {'p90':>4}  "
+          f"{'winners':>8}  {'shared':>7}  {'max':>5}  {'payout':>9}  {'p99 payout':>10}")
+    for i, size in enumerate(hall_sizes):
+        calls = first[:, i]
+        count = winners[:, i]
+        p10, p50, p90 = np.percentile(calls, [10, 50, 90])
+        payout = count * prize
+        print(f"{size:9}  {calls.mean():10.2f}  {p10:4.0f}  {p50:4.0f}  {p90:4.0f}  "
+              f"{count.mean():8.2f}  {np.mean(count > 1):7.1%}  {count.max():5}  "
+              f"{payout.mean():9.2f}  {np.percentile(payout, 99):10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simulate first winners in bingo halls of many sizes")
+    parser.add_argument("--cards", type=int, default=1000000, help="largest hall size")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--lines", type=int, default=1, help="lines needed to win")
+    parser.add_argument("--prize", type=float, default=1.0,
+                        help="prize paid to each simultaneous winner")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    hall_sizes = [10]
+    while hall_sizes[-1] * 10 <= args.cards:
+        hall_sizes.append(hall_sizes[-1] * 10)
+
+    rng = np.random.default_rng(args.seed)
+    cards = random_cards(hall_sizes[-1], rng)
+    start = time.perf_counter()
+    first, winners = simulate(cards, args.games, hall_sizes, args.lines, rng)
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games against {hall_sizes[-1]} cards in {elapsed:.2f} s\n")
+    print_report(hall_sizes, first, winners, args.prize)
+
+
+if __name__ == "__main__":
+    main()
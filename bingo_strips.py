@@ -0,0 +1,187 @@
+import argparse
+import os
+import time
+from itertools import combinations
+
+import numpy as np
+
+from bingo_cards import StockFile, write_header, finish_stock
+
+# 90-ball strips: six tickets of 3 rows by 9 columns. Every row holds five
+# numbers, every ticket has at least one number in each column, column c
+# holds 1-9, 10-19, ... 80-90, numbers rise down each ticket column, and
+# the strip uses each of 1-90 exactly once.
+#
+# A strip is built in three steps, each of which always succeeds, so no
+# candidate is ever thrown away:
+#   1. Column counts: each ticket starts with one number per column and
+#      takes 6 more. The extra numbers of each column (3 for 1-9, 5 for
+#      80-90, 4 otherwise) are handed out one at a time to the ticket with
+#      the most still to take, ties broken at random. The remaining needs
+#      never differ by more than one, so every ticket ends with exactly 15.
+#   2. Row layout: a ticket's cells are drawn uniformly from all layouts
+#      with five cells per row that match its column counts, looked up in a
+#      table of every valid layout grouped by column counts.
+#   3. Numbers: each column's numbers are dealt to the tickets at random
+#      and placed top to bottom in ascending order.
+TICKETS = 6
+ROWS = 3
+COLUMNS = 9
+COLUMN_SIZES = np.array([9, 10, 10, 10, 10, 10, 10, 10, 11])
+EXTRAS = COLUMN_SIZES - TICKETS
+# Column of each number 1-90, indexed by number - 1
+NUMBER_COLUMNS = np.repeat(np.arange(COLUMNS, dtype=np.float32), COLUMN_SIZES)
+# Owner label of each (column, ticket) pair in column-major order
+OWNER_LABELS = (np.arange(TICKETS) * COLUMNS + np.arange(COLUMNS)[:, None]).astype(np.uint16).ravel()
+POWERS_OF_3 = 3 ** np.arange(COLUMNS, dtype=np.int32)
+
+RECORD_SIZE = TICKETS * ROWS * COLUMNS  # One byte per cell, 0 for blank
+
+_layouts = None
+
+
+def layout_table():
+    # Every valid ticket layout, as the positions (row * 9 + col) of its 15
+    # cells listed column by column and top to bottom, sorted by the base-3
+    # code of its extra numbers per column (count - 1). Layouts with code k
+    # are positions[offsets[k]:offsets[k + 1]].
+    global _layouts
+    if _layouts is None:
+        rows = np.array([sum(1 << c for c in combo)
+                         for combo in combinations(range(COLUMNS), 5)], dtype=np.uint16)
+        r0, r1, r2 = (a.ravel() for a in np.meshgrid(rows, rows, rows, indexing="ij"))
+        covered = (r0 | r1 | r2) == (1 << COLUMNS) - 1
+        masks = np.stack([r0[covered], r1[covered], r2[covered]], axis=1)
+        cells = (masks[:, None, :] >> np.arange(COLUMNS, dtype=np.uint16)[:, None]) & 1
+        codes = (cells.sum(axis=2, dtype=np.int32) - 1) @ POWERS_OF_3
+        order = np.argsort(codes, kind="stable")
+        # nonzero walks each layout's cells in (col, row) order
+        _, flat = np.nonzero(cells[order].reshape(len(order), COLUMNS * ROWS))
+        col, row = np.divmod(flat, ROWS)
+        positions = (row * COLUMNS + col).astype(np.uint8).reshape(len(order), 15)
+        offsets = np.zeros(3 ** COLUMNS + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=3 ** COLUMNS), out=offsets[1:])
+        _layouts = positions, offsets
+    return _layouts
+
+
+def column_counts(count, rng):
+    # Numbers per ticket and column, shape (strips, 6, 9)
+    counts = np.empty((count, TICKETS, COLUMNS), dtype=np.int8)
+    need = np.full(count * TICKETS, TICKETS, dtype=np.float32)
+    first_ticket = np.arange(0, count * TICKETS, TICKETS)
+    # Largest columns first; the 10-number columns in random order
+    for col in [8, *rng.permutation(np.arange(1, 8)), 0]:
+        taken = np.ones(count * TICKETS, dtype=np.int8)
+        # Random fractions break ties between equal needs
+        for noise in rng.random((EXTRAS[col], count, TICKETS), dtype=np.float32):
+            noise += need.reshape(count, TICKETS)
+            chosen = first_ticket + noise.argmax(axis=1)
+            taken[chosen] += 1
+            need[chosen] -= 1
+        counts[:, :, col] = taken.reshape(count, TICKETS)
+    return counts
+
+
+def ticket_layouts(counts, rng):
+    # Cell positions of every ticket, shape (strips, 6, 15), each ticket's
+    # layout drawn uniformly from those matching its column counts
+    positions, offsets = layout_table()
+    codes = (counts.reshape(-1, COLUMNS) - 1).astype(np.int32) @ POWERS_OF_3
+    start = offsets[codes]
+    size = offsets[codes + 1] - start
+    picks = start + (rng.random(len(codes)) * size).astype(np.int64)
+    return positions[picks].reshape(counts.shape[0], TICKETS, 15)
+
+
+def fill_numbers(counts, layouts, rng):
+    # Deal the numbers of every column to the tickets and lay them out
+    count = len(counts)
+    # A random order of each column's numbers: sort random keys offset by
+    # the column, so the keys of one column stay together
+    keys = rng.random((count, 90), dtype=np.float32)
+    keys += NUMBER_COLUMNS
+    shuffled = np.argsort(keys, axis=1).astype(np.uint16) + 1
+    # The places of column c are taken ticket by ticket, and the n-th number
+    # of column c in the random order goes to the owner of place n. Owners
+    # are labelled ticket * 9 + column, so sorting by owner then number
+    # lists each ticket's numbers column by column in ascending order.
+    owners = np.repeat(np.tile(OWNER_LABELS, count),
+                       counts.transpose(0, 2, 1).ravel()).reshape(count, 90)
+    keys = np.sort(owners * np.uint16(128) + shuffled, axis=1, kind="stable")
+    numbers = (keys & 127).astype(np.uint8).reshape(count, TICKETS, 15)
+    strips = np.zeros((count, TICKETS, ROWS * COLUMNS), dtype=np.uint8)
+    np.put_along_axis(strips, layouts, numbers, axis=2)
+    return strips.reshape(count, TICKETS, ROWS, COLUMNS)
+
+
+def random_strips(count, rng):
+    # count strips as a (strips, 6, 3, 9) uint8 array, 0 for blank cells
+    counts = column_counts(count, rng)
+    return fill_numbers(counts, ticket_layouts(counts, rng), rng)
+
+
+class StripFile(StockFile):
+    # 90-ball strip stock
+
+    def __init__(self, path):
+        super().__init__(path, 90)
+
+    def strip(self, n):
+        # Strip n as six 3x9 tickets, 0 for blank cells
+        return np.frombuffer(self.record(n), dtype=np.uint8).reshape(TICKETS, ROWS, COLUMNS)
+
+    def strips(self, start=0, stop=None):
+        return self.records(start, stop).reshape(-1, TICKETS, ROWS, COLUMNS)
+
+
+def generate(path, count, seed=None, batch_size=65536):
+    # Write count strips to path in batches; returns the strip count
+    rng = np.random.default_rng(seed)
+    written = 0
+    with open(path, "wb") as f:
+        write_header(f, 90, RECORD_SIZE, 0)
+        while written < count:
+            batch = random_strips(min(batch_size, count - written), rng)
+            f.write(batch.tobytes())
+            written += len(batch)
+        finish_stock(f, 90, RECORD_SIZE, written)
+    return written
+
+
+def format_ticket(ticket):
+    return "\n".join(" ".join("  " if number == 0 else f"{number:2}" for number in row)
+                     for row in ticket)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate 90-ball bingo strips")
+    parser.add_argument("path", help="strip stock file")
+    parser.add_argument("--count", type=int, default=1000000, help="strips to generate")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--show", type=int, nargs="+", metavar="N",
+                        help="print strips from an existing stock instead")
+    args = parser.parse_args()
+
+    if args.show:
+        stock = StripFile(args.path)
+        for n in args.show:
+            print(f"Strip {n}")
+            print("\n\n".join(format_ticket(ticket) for ticket in stock.strip(n)) + "\n")
+        stock.close()
+        return
+
+    start = time.perf_counter()
+    layout_table()
+    print(f"Layout table built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    written = generate(args.path, args.count, args.seed)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.path)
+    print(f"Wrote {written} strips ({size / 1e6:.1f} MB) to {args.path} in {elapsed:.2f} s, "
+          f"{written / elapsed:,.0f} strips/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,279 @@
+import argparse
+import os
+
 class TicTacToe:
-    def __init__(self):
-        self.board = [" " for _ in range(9)]
+    # Directions checked through the last move: row, column and both diagonals
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    def __init__(self, rows=3, cols=3, k=3):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.board = [" " for _ in range(rows * cols)]
         self.current_player = "X"
+        self.last_move = None
+        self.move_count = 0
+        self.move_stack = []
+
+    @classmethod
+    def from_board(cls, board, rows=3, cols=3, k=3):
+        # Rebuild a game from a board list (" " or "" for empty cells) by
+        # replaying the X and O stones alternately
+        game = cls(rows, cols, k)
+        x_cells = [i for i, cell in enumerate(board) if cell == "X"]
+        o_cells = [i for i, cell in enumerate(board) if cell == "O"]
+        for turn in range(len(x_cells) + len(o_cells)):
+            game.make_move((x_cells if turn % 2 == 0 else o_cells)[turn // 2])
+        return game
 
     def make_move(self, position):
         if self.board[position] == " ":
             self.board[position] = self.current_player
             self.current_player = "O" if self.current_player == "X" else "X"
+            self.last_move = position
+            self.move_count += 1
+            self.move_stack.append(position)
             return True
         return False
 
+    def unmake_move(self):
+        # Take back the most recent move, so searches can walk the game tree
+        # without copying the board at every node
+        position = self.move_stack.pop()
+        self.current_player = self.board[position]
+        self.board[position] = " "
+        self.last_move = self.move_stack[-1] if self.move_stack else None
+        self.move_count -= 1
+        return position
+
+    def legal_moves(self):
+        return [i for i, cell in enumerate(self.board) if cell == " "]
+
+    def random_playout(self, rng):
+        # Play uniformly random moves to the end of the game and return the
+        # winner (None for a tie), leaving the game as it was. A shuffled
+        # list of the empty cells is a uniformly random move order.
+        winner = self.check_winner()
+        if winner or self.is_board_full():
+            return winner
+        moves = self.legal_moves()
+        rng.shuffle(moves)
+        made = 0
+        for position in moves:
+            self.make_move(position)
+            made += 1
+            winner = self.winner_through(position)
+            if winner:
+                break
+        for _ in range(made):
+            self.unmake_move()
+        return winner
+
     def check_winner(self):
-        # Check rows
-        for i in range(0, 9, 3):
-            if self.board[i] == self.board[i+1] == self.board[i+2] != " ":
-                return self.board[i]
+        # Only the lines through the last placed stone can have changed
+        if self.last_move is not None:
+            return self.winner_through(self.last_move)
+
+        # No move history (board set up by hand), so scan every stone
+        for position, cell in enumerate(self.board):
+            if cell != " " and self.winner_through(position):
+                return cell
+        return None
+
+    def winner_through(self, position):
+        player = self.board[position]
+        if player == " ":
+            return None
+        row, col = divmod(position, self.cols)
+        for dr, dc in self.DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * dr, col + sign * dc
+                while (0 <= r < self.rows and 0 <= c < self.cols
+                       and self.board[r * self.cols + c] == player):
+                    count += 1
+                    r += sign * dr
+                    c += sign * dc
+            if count >= self.k:
+                return player
+        return None
+
+    def winning_cells(self, position):
+        # Cells of the completed line through position, for highlighting
+        player = self.board[position]
+        row, col = divmod(position, self.cols)
+        for dr, dc in self.DIRECTIONS:
+            cells = [position]
+            for sign in (1, -1):
+                r, c = row + sign * dr, col + sign * dc
+                while (0 <= r < self.rows and 0 <= c < self.cols
+                       and self.board[r * self.cols + c] == player):
+                    cells.append(r * self.cols + c)
+                    r += sign * dr
+                    c += sign * dc
+            if len(cells) >= self.k:
+                return sorted(cells)
+        return []
+
+    def is_board_full(self):
+        if self.last_move is None:
+            return " " not in self.board
+        return self.move_count == len(self.board)
+
+    def display_board(self):
+        for i in range(0, len(self.board), self.cols):
+            print(" " + " | ".join(self.board[i:i + self.cols]) + " ")
+            if i < len(self.board) - self.cols:
+                print("-" * (4 * self.cols - 1))
+
 
-        # Check columns
-        for i in range(3):
-            if self.board[i] == self.board[i+3] == self.board[i+6] != " ":
-                return self.board[i]
+# Bit i of a side's mask is set when that side holds position i
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # Rows
+    0b001001001, 0b010010010, 0b100100100,  # Columns
+    0b100010001, 0b001010100  # Diagonals
+)
+FULL_MASK = 0b111111111
 
-        # Check diagonals
-        if self.board[0] == self.board[4] == self.board[8] != " ":
-            return self.board[0]
-        if self.board[2] == self.board[4] == self.board[6] != " ":
-            return self.board[2]
+# WIN_TABLE[mask] is True when mask contains a complete line
+WIN_TABLE = tuple(any(mask & win == win for win in WIN_MASKS)
+                  for mask in range(FULL_MASK + 1))
 
+# EMPTY_CELLS[occupied] lists the free positions of an occupancy mask
+EMPTY_CELLS = tuple(tuple(i for i in range(9) if not occupied >> i & 1)
+                    for occupied in range(FULL_MASK + 1))
+
+
+# Drop-in replacement for TicTacToe that keeps each side as a 9-bit int
+class BitboardTicTacToe:
+    rows = cols = k = 3
+
+    def __init__(self):
+        self.x_bits = 0
+        self.o_bits = 0
+        self.current_player = "X"
+        self.move_stack = []
+
+    @property
+    def board(self):
+        return ["X" if self.x_bits >> i & 1 else "O" if self.o_bits >> i & 1 else " "
+                for i in range(9)]
+
+    def make_move(self, position):
+        if not 0 <= position < 9:
+            raise IndexError(f"position {position} out of range")
+        bit = 1 << position
+        if (self.x_bits | self.o_bits) & bit:
+            return False
+        if self.current_player == "X":
+            self.x_bits |= bit
+            self.current_player = "O"
+        else:
+            self.o_bits |= bit
+            self.current_player = "X"
+        self.move_stack.append(position)
+        return True
+
+    def unmake_move(self):
+        position = self.move_stack.pop()
+        mask = ~(1 << position)
+        if self.current_player == "O":
+            self.x_bits &= mask
+            self.current_player = "X"
+        else:
+            self.o_bits &= mask
+            self.current_player = "O"
+        return position
+
+    def legal_moves(self):
+        return list(EMPTY_CELLS[self.x_bits | self.o_bits])
+
+    def random_playout(self, rng):
+        # As TicTacToe.random_playout, played on copies of the two masks so
+        # there is nothing to take back
+        winner = self.check_winner()
+        if winner or self.is_board_full():
+            return winner
+        moves = list(EMPTY_CELLS[self.x_bits | self.o_bits])
+        rng.shuffle(moves)
+        x_bits, o_bits = self.x_bits, self.o_bits
+        x_to_move = self.current_player == "X"
+        for position in moves:
+            if x_to_move:
+                x_bits |= 1 << position
+                if WIN_TABLE[x_bits]:
+                    return "X"
+            else:
+                o_bits |= 1 << position
+                if WIN_TABLE[o_bits]:
+                    return "O"
+            x_to_move = not x_to_move
+        return None
+
+    def check_winner(self):
+        if WIN_TABLE[self.x_bits]:
+            return "X"
+        if WIN_TABLE[self.o_bits]:
+            return "O"
         return None
 
     def is_board_full(self):
-        return " " not in self.board
+        return self.x_bits | self.o_bits == FULL_MASK
 
     def display_board(self):
+        board = self.board
         for i in range(0, 9, 3):
-            print(f" {self.board[i]} | {self.board[i+1]} | {self.board[i+2]} ")
+            print(f" {board[i]} | {board[i+1]} | {board[i+2]} ")
             if i < 6:
                 print("-----------")
 
-def main():
-    game = TicTacToe()
+
+# Score many (x_bits, o_bits) boards in one call: "X"/"O" for a win,
+# "tie" for a full board and None for a game still in progress
+def check_winners(boards):
+    return ["X" if WIN_TABLE[x] else "O" if WIN_TABLE[o]
+            else "tie" if x | o == FULL_MASK else None
+            for x, o in boards]
+
+
+def computer_move(game, time_limit=1.0):
+    # Perfect play on the classic board and on 4x4 once its tablebase has
+    # been generated, alpha-beta search on anything larger
+    if (game.rows, game.cols, game.k) == (3, 3, 3):
+        from tic_tac_toe_solver import best_move
+        return best_move(game.board)
+    if (game.rows, game.cols, game.k) == (4, 4, 4):
+        from tic_tac_toe_tablebase import default_path, best_move
+        if os.path.exists(default_path(game.rows, game.cols, game.k)):
+            return best_move(game.board, game.rows, game.cols, game.k)
+    from tic_tac_toe_search import best_move
+    return best_move(game, time_limit)
+
+
+def main(rows=3, cols=3, k=3):
+    game = TicTacToe(rows, cols, k)
+    last = rows * cols - 1
     print("Welcome to Tic Tac Toe!")
-    print("Positions are numbered from 0-8, left to right, top to bottom")
+    if (rows, cols, k) != (3, 3, 3):
+        print(f"{rows}x{cols} board, {k} in a row wins")
+    print(f"Positions are numbered from 0-{last}, left to right, top to bottom")
+
+    computer = None
+    if input("Play against the computer? (y/n): ").strip().lower().startswith("y"):
+        computer = "O"
     
     while True:
         game.display_board()
         print(f"\nPlayer {game.current_player}'s turn")
         
         try:
-            position = int(input("Enter position (0-8): "))
-            if position < 0 or position > 8:
-                print("Position must be between 0 and 8")
+            if game.current_player == computer:
+                position = computer_move(game)
+                print(f"Computer plays {position}")
+            else:
+                position = int(input(f"Enter position (0-{last}): "))
+            if position < 0 or position > last:
+                print(f"Position must be between 0 and {last}")
                 continue
                 
             if not game.make_move(position):
@@ -72,4 +295,9 @@ def main():
             print("Please enter a valid number")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe in the terminal")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("-k", type=int, default=3, help="stones in a row needed to win")
+    args = parser.parse_args()
+    main(args.rows, args.cols, args.k)
@@ -0,0 +1,122 @@
+import argparse
+import sys
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+from tic_tac_toe import WIN_TABLE, FULL_MASK
+
+# Input: one recorded game per line, as moves 0-8 separated by spaces or
+# commas ("4 0 8 2") or run together ("4082").
+#
+# Output: one line per game, in input order:
+#   X / O            the player who won with the last move
+#   draw             the board filled up without a winner
+#   unfinished       legal moves, but the game has not ended
+#   illegal N MOVE   move number N (from 1) is not a legal move, including
+#                    any move after the game has already ended
+
+CELL_BITS = {str(i): 1 << i for i in range(9)}
+
+# Finished games repeat a lot in match logs, so results are cached. The
+# cache is cleared when it reaches its limit to keep memory bounded.
+CACHE_LIMIT = 500000
+_cache = {}
+
+
+def adjudicate(line):
+    result = _cache.get(line)
+    if result is not None:
+        return result
+
+    tokens = line.replace(",", " ").split()
+    if len(tokens) == 1:
+        tokens = tokens[0]
+    x_bits = o_bits = 0
+    result = "unfinished"
+    for ply, token in enumerate(tokens):
+        bit = CELL_BITS.get(token)
+        if bit is None or (x_bits | o_bits) & bit or result != "unfinished":
+            result = f"illegal {ply + 1} {token}"
+            break
+        if ply & 1:
+            o_bits |= bit
+            if WIN_TABLE[o_bits]:
+                result = "O"
+        else:
+            x_bits |= bit
+            if WIN_TABLE[x_bits]:
+                result = "X"
+        if result == "unfinished" and x_bits | o_bits == FULL_MASK:
+            result = "draw"
+
+    if len(_cache) >= CACHE_LIMIT:
+        _cache.clear()
+    _cache[line] = result
+    return result
+
+
+def adjudicate_chunk(lines):
+    return "".join(adjudicate(line) + "\n" for line in lines)
+
+
+def read_chunks(streams, chunk_size):
+    for stream in streams:
+        while True:
+            lines = list(islice(stream, chunk_size))
+            if not lines:
+                break
+            yield lines
+
+
+def run(streams, output, workers=1, chunk_size=10000):
+    # Adjudicate every game and write results as they are ready. At most a
+    # few chunks per worker are in flight at once, so memory use does not
+    # depend on the size of the input. Returns the number of games.
+    games = 0
+    if workers <= 1:
+        for lines in read_chunks(streams, chunk_size):
+            output.write(adjudicate_chunk(lines))
+            games += len(lines)
+        return games
+
+    with Pool(workers) as pool:
+        pending = deque()
+        for lines in read_chunks(streams, chunk_size):
+            pending.append(pool.apply_async(adjudicate_chunk, (lines,)))
+            games += len(lines)
+            if len(pending) >= 4 * workers:
+                output.write(pending.popleft().get())
+        while pending:
+            output.write(pending.popleft().get())
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check recorded Tic Tac Toe games and report their results")
+    parser.add_argument("files", nargs="*", default=["-"],
+                        help="files of move sequences, one game per line (- for stdin)")
+    parser.add_argument("-j", "--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    streams = []
+    for path in args.files:
+        streams.append(sys.stdin if path == "-" else open(path, buffering=1 << 20))
+    start = time.perf_counter()
+    try:
+        games = run(streams, sys.stdout, args.workers, args.chunk_size)
+    finally:
+        for stream in streams:
+            if stream is not sys.stdin:
+                stream.close()
+    sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{games} games in {elapsed:.2f} s, {games / max(elapsed, 1e-9):,.0f} games/s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
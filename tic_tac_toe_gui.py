@@ -1,14 +1,94 @@
+import argparse
 import tkinter as tk
-from tkinter import messagebox
+import multiprocessing
 import random
 
-class TicTacToeGUI:
-    def __init__(self, root):
+from tic_tac_toe import TicTacToe, computer_move
+
+# Seconds the computer may spend on a move, and how often the GUI checks
+# whether it has finished
+COMPUTER_TIME_LIMIT = 1.0
+POLL_INTERVAL_MS = 50
+
+
+def search_move(board, rows, cols, k, time_limit):
+    # Runs in a worker process, so the Tk mainloop never waits on a search
+    game = TicTacToe.from_board(board, rows, cols, k)
+    return computer_move(game, time_limit)
+
+
+class ComputerOpponent:
+    # Computer moves for a Tk game window, searched in a worker process so
+    # the mainloop never waits on a search. Each search is tagged with the
+    # game generation it was started in, so a result that arrives after New
+    # Game is dropped. The window provides root, game, game_over,
+    # vs_computer, turn_label, place(move) and search_task(), which returns
+    # the function to run in the worker and its arguments.
+
+    def init_computer(self):
+        self.pool = None
+        self.pending = None
+        self.generation = 0
+        self.thinking_ticks = 0
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def computer_move(self):
+        if (not self.vs_computer.get() or self.game.current_player != "O"
+                or self.game_over or self.pending is not None):
+            return
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(1)
+        self.pending = self.pool.apply_async(*self.search_task())
+        self.thinking_ticks = 0
+        self.root.after(POLL_INTERVAL_MS, self.poll_computer, self.generation)
+
+    def poll_computer(self, generation):
+        if generation != self.generation or self.pending is None:
+            return
+        if not self.pending.ready():
+            self.thinking_ticks += 1
+            dots = "." * (self.thinking_ticks // 5 % 4)
+            self.turn_label.config(text=f"Computer is thinking{dots}")
+            self.root.after(POLL_INTERVAL_MS, self.poll_computer, generation)
+            return
+        search, self.pending = self.pending, None
+        self.place(search.get())
+
+    def cancel_computer(self):
+        # A running search is stopped by terminating its worker, so the next
+        # game's first computer move does not queue behind it; a new worker
+        # is started when it is needed
+        self.generation += 1
+        if self.pending is not None:
+            self.pending = None
+            self.stop_pool()
+
+    def stop_pool(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def close(self):
+        self.cancel_computer()
+        self.stop_pool()
+        self.root.destroy()
+
+
+class TicTacToeGUI(ComputerOpponent):
+    def __init__(self, root, rows=3, cols=3, k=3):
         self.root = root
         self.root.title("Tic Tac Toe")
-        self.current_player = "X"
-        self.board = [""] * 9
-        self.buttons = []
+        self.game = TicTacToe(rows, cols, k)
+        self.game_over = False
+
+        # The board is drawn on one canvas: the grid is a fixed set of lines
+        # and each move adds a single text item, so startup and per-move
+        # redraw cost do not grow with the number of cells
+        self.cell_size = max(20, min(100, 600 // max(rows, cols)))
+        self.marks = []
+
+        self.init_computer()
         
         # Configure style
         self.root.configure(bg='#2C3E50')
@@ -29,24 +109,32 @@ class TicTacToeGUI:
                                  fg='#ECF0F1', bg='#2C3E50')
         self.turn_label.pack(pady=5)
 
+        # Computer opponent toggle; the computer always plays O
+        self.vs_computer = tk.BooleanVar(value=False)
+        computer_check = tk.Checkbutton(root,
+                                        text="Play vs Computer",
+                                        variable=self.vs_computer,
+                                        font=('Helvetica', 12),
+                                        fg='#ECF0F1', bg='#2C3E50',
+                                        selectcolor='#34495E',
+                                        activebackground='#2C3E50',
+                                        activeforeground='#ECF0F1',
+                                        command=self.computer_move)
+        computer_check.pack()
+
         # Game board
-        self.game_frame = tk.Frame(root, bg='#2C3E50')
-        self.game_frame.pack(padx=10, pady=10)
-
-        for i in range(3):
-            for j in range(3):
-                button = tk.Button(self.game_frame, 
-                                 text="",
-                                 font=('Helvetica', 20, 'bold'),
-                                 width=5, height=2,
-                                 bg='#34495E',
-                                 fg='#ECF0F1',
-                                 activebackground='#2980B9',
-                                 relief=tk.RAISED,
-                                 command=lambda row=i, col=j: 
-                                     self.button_click(row, col))
-                button.grid(row=i, column=j, padx=3, pady=3)
-                self.buttons.append(button)
+        width = cols * self.cell_size
+        height = rows * self.cell_size
+        self.canvas = tk.Canvas(root, width=width, height=height,
+                                bg='#34495E', highlightthickness=0)
+        self.canvas.pack(padx=10, pady=10)
+        for row in range(1, rows):
+            self.canvas.create_line(0, row * self.cell_size, width, row * self.cell_size,
+                                    fill='#2C3E50', width=3)
+        for col in range(1, cols):
+            self.canvas.create_line(col * self.cell_size, 0, col * self.cell_size, height,
+                                    fill='#2C3E50', width=3)
+        self.canvas.bind("<Button-1>", self.canvas_click)
 
         # Reset button
         reset_button = tk.Button(root, 
@@ -58,54 +146,74 @@ class TicTacToeGUI:
                                command=self.reset_game)
         reset_button.pack(pady=10)
 
-    def button_click(self, row, col):
-        index = 3 * row + col
-        if self.board[index] == "":
-            self.board[index] = self.current_player
-            self.buttons[index].config(text=self.current_player,
-                                     state=tk.DISABLED,
-                                     disabledforeground='#E74C3C' if self.current_player == 'X' else '#3498DB')
-            
-            if self.check_winner():
-                messagebox.showinfo("Game Over", f"Player {self.current_player} wins!")
-                self.reset_game()
-            elif "" not in self.board:
-                messagebox.showinfo("Game Over", "It's a tie!")
-                self.reset_game()
-            else:
-                self.current_player = "O" if self.current_player == "X" else "X"
-                self.turn_label.config(text=f"Player {self.current_player}'s Turn")
-
-    def check_winner(self):
-        # Check rows, columns and diagonals
-        win_combinations = [
-            [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Rows
-            [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Columns
-            [0, 4, 8], [2, 4, 6]  # Diagonals
-        ]
-        
-        for combo in win_combinations:
-            if (self.board[combo[0]] == self.board[combo[1]] == 
-                self.board[combo[2]] != ""):
-                # Highlight winning combination
-                for i in combo:
-                    self.buttons[i].config(bg='#27AE60')
-                return True
-        return False
+    def canvas_click(self, event):
+        # Map the click to a cell arithmetically; clicks are ignored while
+        # the computer is thinking
+        row = event.y // self.cell_size
+        col = event.x // self.cell_size
+        if self.pending is None and 0 <= row < self.game.rows and 0 <= col < self.game.cols:
+            self.place(row * self.game.cols + col)
+
+    def place(self, index):
+        player = self.game.current_player
+        if self.game_over or not self.game.make_move(index):
+            return
+        self.draw_mark(index, player)
+
+        # The result is shown in the turn label rather than a modal dialog,
+        # so the window keeps handling events until New Game is pressed
+        if self.game.check_winner():
+            self.game_over = True
+            self.highlight(self.game.winning_cells(index))
+            self.turn_label.config(text=f"Player {player} wins!")
+        elif self.game.is_board_full():
+            self.game_over = True
+            self.turn_label.config(text="It's a tie!")
+        else:
+            self.turn_label.config(text=f"Player {self.game.current_player}'s Turn")
+            self.computer_move()
+
+    def draw_mark(self, index, player):
+        row, col = divmod(index, self.game.cols)
+        self.marks.append(self.canvas.create_text(
+            (col + 0.5) * self.cell_size, (row + 0.5) * self.cell_size,
+            text=player,
+            font=('Helvetica', self.cell_size * 2 // 5, 'bold'),
+            fill='#E74C3C' if player == 'X' else '#3498DB'))
+
+    def highlight(self, cells):
+        # Winning cells get a background rectangle below their marks
+        for index in cells:
+            row, col = divmod(index, self.game.cols)
+            item = self.canvas.create_rectangle(
+                col * self.cell_size + 2, row * self.cell_size + 2,
+                (col + 1) * self.cell_size - 2, (row + 1) * self.cell_size - 2,
+                fill='#27AE60', outline='')
+            self.canvas.tag_lower(item)
+            self.marks.append(item)
+
+    def search_task(self):
+        return search_move, (list(self.game.board), self.game.rows, self.game.cols,
+                             self.game.k, COMPUTER_TIME_LIMIT)
 
     def reset_game(self):
-        self.current_player = "X"
-        self.board = [""] * 9
+        # Only the items added during the game are removed; the grid stays
+        self.cancel_computer()
+        self.game = TicTacToe(self.game.rows, self.game.cols, self.game.k)
+        self.game_over = False
         self.turn_label.config(text="Player X's Turn")
-        for button in self.buttons:
-            button.config(text="",
-                        state=tk.NORMAL,
-                        bg='#34495E')
+        self.canvas.delete(*self.marks)
+        self.marks = []
 
-def main():
+def main(rows=3, cols=3, k=3):
     root = tk.Tk()
-    game = TicTacToeGUI(root)
+    game = TicTacToeGUI(root, rows, cols, k)
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe in a window")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("-k", type=int, default=3, help="stones in a row needed to win")
+    args = parser.parse_args()
+    main(args.rows, args.cols, args.k)
@@ -0,0 +1,237 @@
+import math
+import random
+import time
+from array import array
+
+from tic_tac_toe import TicTacToe
+
+
+class MCTS:
+    # Monte Carlo Tree Search over any game with the TicTacToe interface
+    # (current_player, legal_moves, make_move, unmake_move, move_stack,
+    # check_winner, is_board_full, random_playout).
+    #
+    # Nodes live in preallocated parallel arrays rather than per-node
+    # objects. The children of a node are allocated as one contiguous block
+    # and chained through the sibling array. Wins are stored doubled (2 for a
+    # win, 1 for a draw) from the point of view of the player who made the
+    # move leading into the node, so every counter is a plain integer.
+
+    def __init__(self, capacity=1000000, exploration=1.4, seed=None):
+        self.capacity = capacity
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.visits, self.wins, self.move, self.first_child, self.sibling = \
+            self._allocate()
+        # Spare set of arrays that the tree is compacted into on reuse
+        self._spare = None
+        self.reset()
+
+        # Statistics from the last call to search()
+        self.playouts = 0
+        self.elapsed = 0.0
+
+    def _allocate(self):
+        return (array("I", [0]) * self.capacity,
+                array("I", [0]) * self.capacity,
+                array("i", [-1]) * self.capacity,
+                array("i", [-1]) * self.capacity,
+                array("i", [-1]) * self.capacity)
+
+    @property
+    def bytes_per_node(self):
+        return sum(arr.itemsize for arr in
+                   (self.visits, self.wins, self.move, self.first_child, self.sibling))
+
+    def reset(self):
+        self._clear_tree()
+        self.path = []
+        self.shape = None
+
+    def _clear_tree(self):
+        self.root = 0
+        self.size = 1
+        self.visits[0] = self.wins[0] = 0
+        self.move[0] = self.first_child[0] = self.sibling[0] = -1
+
+    # Tree reuse
+
+    def sync(self, game):
+        # Move the root to the current position of game, keeping the subtree
+        # under the moves played since the last search. Moves only mean the
+        # same thing in games of the same kind and size.
+        shape = (type(game), getattr(game, "rows", None), getattr(game, "cols", None),
+                 getattr(game, "k", None))
+        history = game.move_stack
+        if shape != self.shape or history[:len(self.path)] != self.path:
+            self.reset()
+            self.shape = shape
+            self.path = list(history)
+            return
+        for position in history[len(self.path):]:
+            self.advance(position)
+
+    def advance(self, position):
+        child = self.first_child[self.root]
+        while child != -1 and self.move[child] != position:
+            child = self.sibling[child]
+        self.path.append(position)
+        if child == -1:
+            self._clear_tree()
+        else:
+            self._compact(child)
+
+    def _compact(self, new_root):
+        # Copy the subtree under new_root to the front of the spare arrays,
+        # block by block in breadth-first order, then swap the arrays
+        if self._spare is None:
+            self._spare = self._allocate()
+        visits, wins, move, first_child, sibling = self._spare
+
+        visits[0] = self.visits[new_root]
+        wins[0] = self.wins[new_root]
+        move[0] = self.move[new_root]
+        sibling[0] = -1
+        queue = [(new_root, 0)]
+        size = 1
+        for old, new in queue:
+            child = self.first_child[old]
+            if child == -1:
+                first_child[new] = -1
+                continue
+            first_child[new] = size
+            while child != -1:
+                visits[size] = self.visits[child]
+                wins[size] = self.wins[child]
+                move[size] = self.move[child]
+                sibling[size] = size + 1
+                queue.append((child, size))
+                size += 1
+                child = self.sibling[child]
+            sibling[size - 1] = -1
+
+        self._spare = (self.visits, self.wins, self.move, self.first_child, self.sibling)
+        self.visits, self.wins, self.move, self.first_child, self.sibling = \
+            visits, wins, move, first_child, sibling
+        self.root = 0
+        self.size = size
+
+    # Search
+
+    def search(self, game, playouts=None, time_limit=None):
+        # Run playouts from the current position of game and return the most
+        # visited move. Stops after the given number of playouts or seconds,
+        # whichever comes first. game is restored before returning.
+        if playouts is None and time_limit is None:
+            time_limit = 1.0
+        self.sync(game)
+        start = time.perf_counter()
+        deadline = start + time_limit if time_limit is not None else None
+
+        self.playouts = 0
+        while playouts is None or self.playouts < playouts:
+            self._playout(game)
+            self.playouts += 1
+            if deadline is not None and not self.playouts & 63 \
+                    and time.perf_counter() > deadline:
+                break
+        self.elapsed = time.perf_counter() - start
+        return self.best_move()
+
+    def best_move(self):
+        best = None
+        best_visits = -1
+        child = self.first_child[self.root]
+        while child != -1:
+            if self.visits[child] > best_visits:
+                best_visits = self.visits[child]
+                best = self.move[child]
+            child = self.sibling[child]
+        return best
+
+    def _playout(self, game):
+        visits, wins, move, first_child, sibling = \
+            self.visits, self.wins, self.move, self.first_child, self.sibling
+        exploration = self.exploration
+        root_player = game.current_player
+
+        # Selection
+        node = self.root
+        path = [node]
+        while first_child[node] != -1:
+            log_parent = math.log(visits[node])
+            best = -1
+            best_score = -1.0
+            child = first_child[node]
+            while child != -1:
+                child_visits = visits[child]
+                if child_visits == 0:
+                    best = child
+                    break
+                score = (wins[child] / (2 * child_visits)
+                         + exploration * math.sqrt(log_parent / child_visits))
+                if score > best_score:
+                    best_score = score
+                    best = child
+                child = sibling[child]
+            node = best
+            game.make_move(move[node])
+            path.append(node)
+
+        # Expansion, once a leaf has been visited (the root always expands)
+        made = len(path) - 1
+        winner = game.check_winner()
+        if winner is None and not game.is_board_full() and \
+                (visits[node] or node == self.root):
+            moves = game.legal_moves()
+            if self.size + len(moves) <= self.capacity:
+                first = self.size
+                first_child[node] = first
+                for offset, position in enumerate(moves):
+                    index = first + offset
+                    visits[index] = wins[index] = 0
+                    move[index] = position
+                    first_child[index] = -1
+                    sibling[index] = index + 1
+                sibling[first + len(moves) - 1] = -1
+                self.size += len(moves)
+                node = first + self.rng.randrange(len(moves))
+                game.make_move(move[node])
+                path.append(node)
+                made += 1
+                winner = game.check_winner()
+
+        # Simulation, left to the game so each engine can use its fastest
+        # way of playing random moves
+        if winner is None and not game.is_board_full():
+            winner = game.random_playout(self.rng)
+        for _ in range(made):
+            game.unmake_move()
+
+        # Backpropagation; nodes at odd depth were entered by root_player
+        for depth, node in enumerate(path):
+            visits[node] += 1
+            if winner is None:
+                wins[node] += 1
+            elif (winner == root_player) == (depth & 1 == 1):
+                wins[node] += 2
+
+
+def main():
+    mcts = MCTS(capacity=1000000)
+    game = TicTacToe(9, 9, 5)
+    print(f"Self-play on a 9x9 board, 5 in a row, 1 s per move, "
+          f"{mcts.bytes_per_node} bytes per node")
+    while not game.check_winner() and not game.is_board_full():
+        move = mcts.search(game, time_limit=1.0)
+        print(f"{game.current_player} plays {move:2d}  "
+              f"{mcts.playouts / mcts.elapsed:7.0f} playouts/s  "
+              f"{mcts.size:7d} nodes ({mcts.size * mcts.bytes_per_node / 1e6:.1f} MB)")
+        game.make_move(move)
+    game.display_board()
+    winner = game.check_winner()
+    print(f"\nPlayer {winner} wins!" if winner else "\nIt's a tie!")
+
+
+if __name__ == "__main__":
+    main()
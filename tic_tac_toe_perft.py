@@ -0,0 +1,98 @@
+import argparse
+import time
+
+from tic_tac_toe import TicTacToe, BitboardTicTacToe
+
+BACKENDS = {
+    "list": TicTacToe,
+    "bitboard": BitboardTicTacToe,
+}
+
+# Known counts for the full 3x3 tree from the empty board: positions reached
+# after each ply, and how the 255,168 finished games end
+KNOWN_NODES = (9, 72, 504, 3024, 15120, 54720, 148176, 200448, 127872)
+KNOWN_RESULTS = {"X": 131184, "O": 77904, "tie": 46080}
+
+
+class PerftResult:
+    def __init__(self, depth):
+        self.nodes = [0] * depth
+        self.results = {"X": 0, "O": 0, "tie": 0}
+        self.elapsed = 0.0
+
+    @property
+    def total_nodes(self):
+        return sum(self.nodes)
+
+    @property
+    def games(self):
+        return sum(self.results.values())
+
+
+def perft(game, depth):
+    # Walk every move sequence from the current position of game, up to depth
+    # plies, counting the positions reached at each ply and how finished
+    # games end. Works with any engine that has make_move/unmake_move. A
+    # finished game has no moves to count.
+    result = PerftResult(depth)
+    start = time.perf_counter()
+    if depth > 0 and not game.check_winner() and not game.is_board_full():
+        _perft(game, depth, 0, result.nodes, result.results)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _perft(game, depth, ply, nodes, results):
+    for position in game.legal_moves():
+        game.make_move(position)
+        nodes[ply] += 1
+        winner = game.check_winner()
+        if winner:
+            results[winner] += 1
+        elif game.is_board_full():
+            results["tie"] += 1
+        elif depth > 1:
+            _perft(game, depth - 1, ply + 1, nodes, results)
+        game.unmake_move()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Count every Tic Tac Toe move sequence to a given depth")
+    parser.add_argument("--depth", type=int, default=9)
+    parser.add_argument("--moves", default="",
+                        help="comma separated moves to play before counting")
+    parser.add_argument("--backend", choices=sorted(BACKENDS) + ["all"], default="all")
+    args = parser.parse_args()
+
+    moves = [int(move) for move in args.moves.split(",") if move.strip()]
+    names = sorted(BACKENDS) if args.backend == "all" else [args.backend]
+    failed = False
+    for name in names:
+        game = BACKENDS[name]()
+        for move in moves:
+            if not 0 <= move < 9 or not game.make_move(move):
+                parser.error(f"illegal move {move}")
+            if game.check_winner() or game.is_board_full():
+                parser.error(f"the game is already over after move {move}")
+
+        result = perft(game, args.depth)
+        print(f"{name} backend: {result.total_nodes} nodes in {result.elapsed:.3f} s, "
+              f"{result.total_nodes / result.elapsed:,.0f} nodes/s")
+        for ply, count in enumerate(result.nodes, 1):
+            print(f"  ply {ply}: {count}")
+        print(f"  games: {result.games} (X {result.results['X']}, "
+              f"O {result.results['O']}, tie {result.results['tie']})")
+
+        if not moves and args.depth >= 9:
+            ok = (tuple(result.nodes[:9]) == KNOWN_NODES
+                  and result.results == KNOWN_RESULTS)
+            print("  matches known counts" if ok else "  MISMATCH with known counts")
+            failed = failed or not ok
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import random
+import time
+
+from tic_tac_toe import TicTacToe
+
+WIN_SCORE = 1000000
+
+# Transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class AlphaBetaSearch:
+    # Iterative-deepening alpha-beta for m,n,k boards. The search walks the
+    # game tree with TicTacToe.make_move/unmake_move and keeps its own
+    # incremental state on top of it: a Zobrist hash, per-window stone
+    # counts for the evaluation and a neighbour count used to limit the
+    # candidate moves to cells near existing stones.
+
+    def __init__(self, rows=3, cols=3, k=3, tt_bits=20, radius=2, seed=0):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.radius = radius
+        size = rows * cols
+
+        rng = random.Random(seed)
+        self.zobrist = {
+            "X": [rng.getrandbits(64) for _ in range(size)],
+            "O": [rng.getrandbits(64) for _ in range(size)],
+        }
+
+        # Every k-cell line on the board, and the lines through each cell
+        self.windows = []
+        for row in range(rows):
+            for col in range(cols):
+                for dr, dc in TicTacToe.DIRECTIONS:
+                    end_row = row + dr * (k - 1)
+                    end_col = col + dc * (k - 1)
+                    if 0 <= end_row < rows and 0 <= end_col < cols:
+                        self.windows.append(tuple((row + dr * i) * cols + col + dc * i
+                                                  for i in range(k)))
+        self.cell_windows = [[] for _ in range(size)]
+        for index, window in enumerate(self.windows):
+            for cell in window:
+                self.cell_windows[cell].append(index)
+
+        # Cells within radius of each cell, for candidate move generation
+        self.neighbours = []
+        for cell in range(size):
+            row, col = divmod(cell, cols)
+            self.neighbours.append([
+                r * cols + c
+                for r in range(max(0, row - radius), min(rows, row + radius + 1))
+                for c in range(max(0, col - radius), min(cols, col + radius + 1))
+                if (r, c) != (row, col)
+            ])
+
+        # Score of a window holding n stones of one side and none of the other
+        self.weights = [0] + [4 ** n for n in range(1, k)] + [WIN_SCORE]
+
+        # Bounded transposition table in parallel lists, indexed by the low
+        # bits of the hash. A slot is replaced when it is empty, belongs to
+        # an older search or was searched to no greater depth.
+        self.tt_size = 1 << tt_bits
+        self.tt_mask = self.tt_size - 1
+        self.tt_key = [0] * self.tt_size
+        self.tt_depth = [-1] * self.tt_size
+        self.tt_value = [0] * self.tt_size
+        self.tt_flag = [EXACT] * self.tt_size
+        self.tt_move = [-1] * self.tt_size
+        self.tt_age = [0] * self.tt_size
+        self.generation = 0
+
+        self.history = [0] * size
+        self.killers = []
+
+        # Statistics from the last call to search()
+        self.nodes = 0
+        self.depth_reached = 0
+        self.elapsed = 0.0
+
+    # Incremental position state
+
+    def _load(self, game):
+        self.game = game
+        self.hash = 0
+        self.x_count = [0] * len(self.windows)
+        self.o_count = [0] * len(self.windows)
+        self.near = [0] * len(game.board)
+        self.score = 0  # Evaluation from X's point of view
+        for cell, player in enumerate(game.board):
+            if player != " ":
+                self._place(cell, player)
+
+    def _window_value(self, index):
+        x, o = self.x_count[index], self.o_count[index]
+        if x and not o:
+            return self.weights[x]
+        if o and not x:
+            return -self.weights[o]
+        return 0
+
+    def _place(self, cell, player):
+        # Update hash, window counts and evaluation for a stone on cell.
+        # Returns True if the stone completes a line.
+        self.hash ^= self.zobrist[player][cell]
+        counts = self.x_count if player == "X" else self.o_count
+        won = False
+        for index in self.cell_windows[cell]:
+            self.score -= self._window_value(index)
+            counts[index] += 1
+            self.score += self._window_value(index)
+            if counts[index] == self.k:
+                won = True
+        for neighbour in self.neighbours[cell]:
+            self.near[neighbour] += 1
+        return won
+
+    def _remove(self, cell, player):
+        self.hash ^= self.zobrist[player][cell]
+        counts = self.x_count if player == "X" else self.o_count
+        for index in self.cell_windows[cell]:
+            self.score -= self._window_value(index)
+            counts[index] -= 1
+            self.score += self._window_value(index)
+        for neighbour in self.neighbours[cell]:
+            self.near[neighbour] -= 1
+
+    def _make(self, cell):
+        player = self.game.current_player
+        self.game.make_move(cell)
+        return self._place(cell, player)
+
+    def _unmake(self):
+        cell = self.game.unmake_move()
+        self._remove(cell, self.game.current_player)
+
+    # Move generation and ordering
+
+    def _candidates(self):
+        board = self.game.board
+        if self.game.move_count == 0:
+            return [(self.rows // 2) * self.cols + self.cols // 2]
+        near = self.near
+        moves = [cell for cell, player in enumerate(board)
+                 if player == " " and near[cell]]
+        return moves or self.game.legal_moves()
+
+    def _ordered_moves(self, ply, tt_move):
+        moves = self._candidates()
+        history = self.history
+        killers = self.killers[ply]
+
+        def priority(cell):
+            if cell == tt_move:
+                return 1 << 62
+            if cell in killers:
+                return (1 << 61) - killers.index(cell)
+            return history[cell]
+
+        moves.sort(key=priority, reverse=True)
+        return moves
+
+    # Search
+
+    def search(self, game, time_limit=0.1, max_depth=None):
+        # Returns the best move for the side to move in game, searching
+        # deeper until time_limit seconds have passed. game is restored to
+        # its original position before returning.
+        self._load(game)
+        self.generation += 1
+        self.history = [h >> 2 for h in self.history]
+        self.nodes = 0
+        self.depth_reached = 0
+        start = time.perf_counter()
+        self.deadline = start + time_limit
+
+        moves = self._candidates()
+        best_move = moves[0] if moves else None
+        max_depth = max_depth or len(game.board) - game.move_count
+        stack_depth = len(game.move_stack)
+        try:
+            for depth in range(1, max_depth + 1):
+                self.killers = [[] for _ in range(depth + 1)]
+                value = self._negamax(depth, 0, -WIN_SCORE - 1, WIN_SCORE + 1)
+                slot = self.hash & self.tt_mask
+                if self.tt_key[slot] == self.hash and self.tt_move[slot] >= 0:
+                    best_move = self.tt_move[slot]
+                self.depth_reached = depth
+                if abs(value) >= WIN_SCORE - len(game.board):
+                    break
+        except SearchTimeout:
+            while len(game.move_stack) > stack_depth:
+                self._unmake()
+        self.elapsed = time.perf_counter() - start
+        return best_move
+
+    def _negamax(self, depth, ply, alpha, beta):
+        self.nodes += 1
+        if not self.nodes & 255 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        game = self.game
+        if game.move_count == len(game.board):
+            return 0
+        if depth == 0:
+            return self.score if game.current_player == "X" else -self.score
+
+        original_alpha = alpha
+        slot = self.hash & self.tt_mask
+        tt_move = -1
+        if self.tt_key[slot] == self.hash:
+            tt_move = self.tt_move[slot]
+            if self.tt_depth[slot] >= depth:
+                value = self._from_tt(self.tt_value[slot], ply)
+                flag = self.tt_flag[slot]
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                elif flag == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        best_value = -WIN_SCORE - 1
+        best_move = -1
+        for cell in self._ordered_moves(ply, tt_move):
+            if self._make(cell):
+                value = WIN_SCORE - ply - 1
+            else:
+                value = -self._negamax(depth - 1, ply + 1, -beta, -alpha)
+            self._unmake()
+
+            if value > best_value:
+                best_value = value
+                best_move = cell
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                killers = self.killers[ply]
+                if cell not in killers:
+                    killers.insert(0, cell)
+                    del killers[2:]
+                self.history[cell] += depth * depth
+                break
+
+        if best_value <= original_alpha:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._store(slot, depth, self._to_tt(best_value, ply), flag, best_move)
+        return best_value
+
+    def _store(self, slot, depth, value, flag, move):
+        if (self.tt_depth[slot] < 0 or self.tt_age[slot] != self.generation
+                or depth >= self.tt_depth[slot]):
+            self.tt_key[slot] = self.hash
+            self.tt_depth[slot] = depth
+            self.tt_value[slot] = value
+            self.tt_flag[slot] = flag
+            self.tt_move[slot] = move
+            self.tt_age[slot] = self.generation
+
+    # Win scores are stored relative to the node so they stay valid when the
+    # same position is reached at a different ply
+
+    def _to_tt(self, value, ply):
+        if value > WIN_SCORE // 2:
+            return value + ply
+        if value < -WIN_SCORE // 2:
+            return value - ply
+        return value
+
+    def _from_tt(self, value, ply):
+        if value > WIN_SCORE // 2:
+            return value - ply
+        if value < -WIN_SCORE // 2:
+            return value + ply
+        return value
+
+
+_searches = {}
+
+
+def best_move(game, time_limit=0.1):
+    # Reuse one search object (and its transposition table) per board shape
+    key = (game.rows, game.cols, game.k)
+    if key not in _searches:
+        _searches[key] = AlphaBetaSearch(*key)
+    return _searches[key].search(game, time_limit)
+
+
+def main():
+    search = AlphaBetaSearch(7, 7, 4)
+    game = TicTacToe(7, 7, 4)
+    print("Self-play on a 7x7 board, 4 in a row, 100 ms per move")
+    while not game.check_winner() and not game.is_board_full():
+        move = search.search(game, 0.1)
+        print(f"{game.current_player} plays {move:2d}  depth {search.depth_reached:2d}  "
+              f"{search.nodes:6d} nodes  {search.elapsed * 1000:5.1f} ms")
+        game.make_move(move)
+    game.display_board()
+    winner = game.check_winner()
+    print(f"\nPlayer {winner} wins!" if winner else "\nIt's a tie!")
+
+
+if __name__ == "__main__":
+    main()
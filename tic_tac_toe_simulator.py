@@ -0,0 +1,147 @@
+import argparse
+import time
+
+import numpy as np
+
+from tic_tac_toe import WIN_MASKS
+
+# Outcome codes used in the result tables
+X_WINS, O_WINS, DRAW = 0, 1, 2
+OUTCOMES = ("X wins", "O wins", "Draw")
+
+# LINES[i, j] is 1 when position i belongs to win line j, so for boards
+# holding +1 for X and -1 for O, boards @ LINES gives every line sum at once
+LINES = np.array([[mask >> i & 1 for mask in WIN_MASKS] for i in range(9)],
+                 dtype=np.float32)
+
+# Base-3 weights for turning a board row into an index into a policy table
+POWERS = 3 ** np.arange(9, dtype=np.int32)
+
+
+def solver_policy():
+    # Best move for every reachable position, indexed by base-3 board code
+    # (0 empty, 1 X, 2 O); -1 for positions the solver never reaches
+    from tic_tac_toe_solver import TicTacToeSolver
+
+    solver = TicTacToeSolver().build()
+    table = np.full(3 ** 9, -1, dtype=np.int8)
+    for code in range(3 ** 9):
+        board = [" XO"[code // 3 ** i % 3] for i in range(9)]
+        try:
+            move = solver.best_move(board)
+        except KeyError:
+            continue
+        if move is not None:
+            table[code] = move
+    return table
+
+
+def simulate_chunk(games, rng, policies=(None, None)):
+    # Play games to the end in lockstep. policies holds an optional move
+    # table for X and for O; a side without one plays uniformly at random.
+    # Returns the first move, second move and outcome of every game.
+    boards = np.zeros((games, 9), dtype=np.int8)
+    ids = np.arange(games)
+    first = np.empty(games, dtype=np.int8)
+    second = np.empty(games, dtype=np.int8)
+    outcome = np.full(games, DRAW, dtype=np.int8)
+    rows = np.arange(games)
+
+    # With both sides random, a random permutation of the cells per game is
+    # a uniformly random move order, so the random moves are drawn up front
+    all_random = all(table is None for table in policies)
+    if all_random:
+        order = rng.random((games, 9), dtype=np.float32).argsort(axis=1).astype(np.int8)
+
+    for ply in range(9):
+        player = 1 if ply % 2 == 0 else -1
+
+        if all_random:
+            moves = order[ids, ply]
+        else:
+            # Random legal move: the largest random key among the empty cells
+            keys = rng.random(boards.shape, dtype=np.float32)
+            keys[boards != 0] = -1.0
+            moves = keys.argmax(axis=1)
+
+            table = policies[ply % 2]
+            if table is not None:
+                chosen = table[(boards % 3).astype(np.int32) @ POWERS]
+                moves = np.where(chosen >= 0, chosen, moves)
+
+        boards[rows[:len(ids)], moves] = player
+        if ply == 0:
+            first[ids] = moves
+        elif ply == 1:
+            second[ids] = moves
+
+        # No line can be complete before the fifth move
+        if ply >= 4:
+            sums = boards.astype(np.float32) @ LINES
+            won = (sums == 3 * player).any(axis=1)
+            outcome[ids[won]] = X_WINS if player == 1 else O_WINS
+            boards = boards[~won]
+            ids = ids[~won]
+
+    return first, second, outcome
+
+
+def simulate(games, x_policy=None, o_policy=None, chunk_size=1000000, seed=None):
+    # Returns per-opening and per-reply result tables: by_opening[first, outcome]
+    # and by_reply[first, second, outcome] count games
+    rng = np.random.default_rng(seed)
+    by_opening = np.zeros((9, 3), dtype=np.int64)
+    by_reply = np.zeros((9, 9, 3), dtype=np.int64)
+    remaining = games
+    while remaining:
+        size = min(chunk_size, remaining)
+        first, second, outcome = simulate_chunk(size, rng, (x_policy, o_policy))
+        by_opening += np.bincount(first.astype(np.int64) * 3 + outcome,
+                                  minlength=27).reshape(9, 3)
+        by_reply += np.bincount((first.astype(np.int64) * 9 + second) * 3 + outcome,
+                                minlength=243).reshape(9, 9, 3)
+        remaining -= size
+    return by_opening, by_reply
+
+
+def print_table(by_opening):
+    print("Opening   " + "".join(f"{name:>10}" for name in OUTCOMES) + "     Games")
+    for position in range(9):
+        counts = by_opening[position]
+        total = counts.sum()
+        if not total:
+            continue
+        print(f"{position:>7}   "
+              + "".join(f"{count / total:>10.2%}" for count in counts)
+              + f"{total:>10}")
+    totals = by_opening.sum(axis=0)
+    print(f"{'All':>7}   "
+          + "".join(f"{count / totals.sum():>10.2%}" for count in totals)
+          + f"{totals.sum():>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Tic Tac Toe games in bulk")
+    parser.add_argument("--games", type=int, default=10000000)
+    parser.add_argument("--x", choices=("random", "solver"), default="random",
+                        help="policy for player X")
+    parser.add_argument("--o", choices=("random", "solver"), default="random",
+                        help="policy for player O")
+    parser.add_argument("--chunk-size", type=int, default=1000000)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    table = solver_policy() if "solver" in (args.x, args.o) else None
+    start = time.perf_counter()
+    by_opening, _ = simulate(args.games,
+                             table if args.x == "solver" else None,
+                             table if args.o == "solver" else None,
+                             args.chunk_size, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games (X: {args.x}, O: {args.o}) in {elapsed:.2f} s, "
+          f"{args.games / elapsed:,.0f} games/s\n")
+    print_table(by_opening)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import time
+
+from tic_tac_toe import WIN_TABLE, FULL_MASK
+
+# The 8 rotations/reflections of the 3x3 board as index permutations:
+# a piece on position i moves to position SYMMETRIES[s][i]
+_ROTATE = (6, 3, 0, 7, 4, 1, 8, 5, 2)
+_MIRROR = (2, 1, 0, 5, 4, 3, 8, 7, 6)
+
+
+def _compose(first, second):
+    return tuple(second[first[i]] for i in range(9))
+
+
+def _build_symmetries():
+    symmetries = []
+    perm = tuple(range(9))
+    for _ in range(4):
+        symmetries.append(perm)
+        symmetries.append(_compose(perm, _MIRROR))
+        perm = _compose(perm, _ROTATE)
+    return tuple(symmetries)
+
+
+SYMMETRIES = _build_symmetries()
+
+# Inverse permutations, used to map a move found on the canonical board
+# back onto the board that was asked about
+INVERSES = tuple(tuple(perm.index(i) for i in range(9)) for perm in SYMMETRIES)
+
+# TRANSFORMS[s][mask] is mask with every bit moved by SYMMETRIES[s], so a
+# whole side is transformed with a single tuple lookup
+TRANSFORMS = tuple(
+    tuple(sum(1 << perm[i] for i in range(9) if mask >> i & 1)
+          for mask in range(FULL_MASK + 1))
+    for perm in SYMMETRIES
+)
+
+
+def canonical(x_bits, o_bits):
+    # Smallest (x, o) key over all symmetries, plus the symmetry that made it
+    best_key = -1
+    best_sym = 0
+    for sym, table in enumerate(TRANSFORMS):
+        key = table[x_bits] << 9 | table[o_bits]
+        if best_key < 0 or key < best_key:
+            best_key = key
+            best_sym = sym
+    return best_key, best_sym
+
+
+def board_to_bits(board):
+    x_bits = o_bits = 0
+    for i, cell in enumerate(board):
+        if cell == "X":
+            x_bits |= 1 << i
+        elif cell == "O":
+            o_bits |= 1 << i
+    return x_bits, o_bits
+
+
+class TicTacToeSolver:
+    def __init__(self):
+        # canonical key -> (score for the side to move, best canonical move)
+        # Scores are 10 - plies for a win and plies - 10 for a loss, so the
+        # solver prefers quick wins and slow losses
+        self.table = {}
+        self.build_seconds = None
+
+    def build(self):
+        start = time.perf_counter()
+        self.table = {}
+        self._solve(0, 0, 0)
+        self.build_seconds = time.perf_counter() - start
+        return self
+
+    def _solve(self, mover, other, plies):
+        # mover/other are the bit masks of the side to move and its opponent
+        if mover.bit_count() == other.bit_count():
+            x_bits, o_bits = mover, other
+        else:
+            x_bits, o_bits = other, mover
+        key, sym = canonical(x_bits, o_bits)
+        entry = self.table.get(key)
+        if entry is None:
+            entry = self._search(mover, other, plies, sym)
+            self.table[key] = entry
+        return entry[0]
+
+    def _search(self, mover, other, plies, sym):
+        if WIN_TABLE[other]:
+            return (plies - 10, None)
+        occupied = mover | other
+        if occupied == FULL_MASK:
+            return (0, None)
+
+        best_score = -100
+        best_move = None
+        for position in range(9):
+            bit = 1 << position
+            if occupied & bit:
+                continue
+            score = -self._solve(other, mover | bit, plies + 1)
+            if score > best_score:
+                best_score = score
+                best_move = position
+        return (best_score, SYMMETRIES[sym][best_move])
+
+    def lookup(self, board):
+        # Returns (score, best position) for the side to move on board, which
+        # may use either " " (CLI) or "" (GUI) for empty cells
+        if not self.table:
+            self.build()
+        x_bits, o_bits = board_to_bits(board)
+        key, sym = canonical(x_bits, o_bits)
+        score, move = self.table[key]
+        if move is None:
+            return score, None
+        return score, INVERSES[sym][move]
+
+    def best_move(self, board):
+        return self.lookup(board)[1]
+
+
+_default_solver = TicTacToeSolver()
+
+
+def best_move(board):
+    return _default_solver.best_move(board)
+
+
+def main():
+    solver = TicTacToeSolver().build()
+    print(f"Solved {len(solver.table)} canonical positions "
+          f"in {solver.build_seconds * 1000:.1f} ms")
+
+    board = [" "] * 9
+    score, move = solver.lookup(board)
+    outcome = "win" if score > 0 else "loss" if score < 0 else "draw"
+    print(f"Empty board: {outcome} for X, best opening move {move}")
+
+    boards = [[" "] * 9, ["X"] + [" "] * 8, ["X", "O"] + [" "] * 7,
+              [" ", " ", " ", " ", "X", " ", " ", " ", "O"]]
+    rounds = 100000
+    start = time.perf_counter()
+    for i in range(rounds):
+        solver.best_move(boards[i & 3])
+    elapsed = time.perf_counter() - start
+    print(f"Lookup latency: {elapsed / rounds * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from itertools import combinations
+
+from tic_tac_toe import TicTacToe
+
+# Results stored in 2 bits per position, from the side to move's point of view.
+# UNKNOWN marks positions that cannot occur in a game.
+UNKNOWN, LOSS, DRAW, WIN = 0, 1, 2, 3
+RESULTS = {LOSS: "loss", DRAW: "draw", WIN: "win"}
+
+MAGIC = b"TTTBASE1"
+HEADER = struct.Struct("<8sBBBxQ")  # magic, rows, cols, k, position count
+
+
+def default_path(rows=4, cols=4, k=4):
+    # Each board shape gets its own file next to this module
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        f"tic_tac_toe_{rows}x{cols}_k{k}.tb")
+
+
+DEFAULT_PATH = default_path()
+
+
+# Positions are ranked to dense indices by reading the board as a base-3
+# number (0 empty, 1 X, 2 O), so a child's rank is the parent's rank plus
+# 3**cell or 2 * 3**cell and never needs to be recomputed from scratch.
+
+def board_rank(board):
+    rank = 0
+    for cell, player in enumerate(board):
+        if player == "X":
+            rank += 3 ** cell
+        elif player == "O":
+            rank += 2 * 3 ** cell
+    return rank
+
+
+def _win_table(rows, cols, k):
+    windows = []
+    for row in range(rows):
+        for col in range(cols):
+            for dr, dc in TicTacToe.DIRECTIONS:
+                if 0 <= row + dr * (k - 1) < rows and 0 <= col + dc * (k - 1) < cols:
+                    windows.append(sum(1 << ((row + dr * i) * cols + col + dc * i)
+                                       for i in range(k)))
+    return bytes(any(mask & window == window for window in windows)
+                 for mask in range(1 << rows * cols))
+
+
+def generate(rows=4, cols=4, k=4, path=None):
+    # Retrograde analysis by layers: every position with n stones is solved
+    # from the already solved positions with n + 1 stones, starting from the
+    # full board. Writes to the file for the shape unless path is given and
+    # returns the number of solved positions.
+    path = path or default_path(rows, cols, k)
+    cells = rows * cols
+    positions = 3 ** cells
+    table = bytearray((positions + 3) // 4)
+    win = _win_table(rows, cols, k)
+
+    pow3 = [3 ** cell for cell in range(cells)]
+    base3 = [0] * (1 << cells)
+    for mask in range(1, 1 << cells):
+        low = (mask & -mask).bit_length() - 1
+        base3[mask] = base3[mask & (mask - 1)] + pow3[low]
+
+    # Rank increments for each empty cell of an occupancy mask
+    x_steps = [tuple(pow3[c] for c in range(cells) if not occupied >> c & 1)
+               for occupied in range(1 << cells)]
+    o_steps = [tuple(2 * step for step in steps) for steps in x_steps]
+    by_count = [[] for _ in range(cells + 1)]
+    for mask in range(1 << cells):
+        by_count[mask.bit_count()].append(mask)
+
+    solved = 0
+    for stones in range(cells, -1, -1):
+        x_count, o_count = (stones + 1) // 2, stones // 2
+        x_to_move = x_count == o_count
+        for x in by_count[x_count]:
+            x_rank = base3[x]
+            free_bits = [1 << c for c in range(cells) if not x >> c & 1]
+            for o_combo in combinations(free_bits, o_count):
+                o = sum(o_combo)
+                rank = x_rank + 2 * base3[o]
+                if x_to_move:
+                    mover_won, last_won = win[x], win[o]
+                else:
+                    mover_won, last_won = win[o], win[x]
+                if mover_won:
+                    continue
+                if last_won:
+                    value = LOSS
+                elif stones == cells:
+                    value = DRAW
+                else:
+                    value = LOSS
+                    for step in (x_steps if x_to_move else o_steps)[x | o]:
+                        child = rank + step
+                        result = table[child >> 2] >> ((child & 3) << 1) & 3
+                        if result == LOSS:
+                            value = WIN
+                            break
+                        if result == DRAW:
+                            value = DRAW
+                table[rank >> 2] |= value << ((rank & 3) << 1)
+                solved += 1
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, rows, cols, k, positions))
+        f.write(table)
+        f.flush()
+        os.fsync(f.fileno())
+    return solved
+
+
+class Tablebase:
+    # Read-only view of a generated tablebase. The file is memory-mapped, so
+    # opening it is instant and every process probing the same file shares
+    # its pages.
+
+    def __init__(self, path=None):
+        path = path or default_path()
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, self.cols, self.k, self.positions = \
+            HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a tic tac toe tablebase")
+        self.offset = HEADER.size
+
+    def close(self):
+        self.data.close()
+
+    def probe(self, rank):
+        return self.data[self.offset + (rank >> 2)] >> ((rank & 3) << 1) & 3
+
+    def result(self, board):
+        # "win", "draw" or "loss" for the side to move
+        return RESULTS.get(self.probe(board_rank(board)))
+
+    def check_shape(self, rows, cols, k):
+        if (self.rows, self.cols, self.k) != (rows, cols, k):
+            raise ValueError(f"tablebase is for {self.rows}x{self.cols} with k={self.k}, "
+                             f"not {rows}x{cols} with k={k}")
+
+    def best_move(self, board):
+        # A move that keeps the best result for the side to move: one that
+        # leaves the opponent lost if possible, otherwise one that draws
+        if len(board) != self.rows * self.cols:
+            raise ValueError(f"board has {len(board)} cells, tablebase is for "
+                             f"{self.rows}x{self.cols}")
+        rank = board_rank(board)
+        x_to_move = sum(cell == "X" for cell in board) == sum(cell == "O" for cell in board)
+        best = None
+        best_result = None
+        for cell, player in enumerate(board):
+            if player not in (" ", ""):
+                continue
+            child = rank + (1 if x_to_move else 2) * 3 ** cell
+            result = self.probe(child)
+            if result == LOSS:
+                return cell
+            if best is None or (result == DRAW and best_result != DRAW):
+                best = cell
+                best_result = result
+        return best
+
+
+_tablebases = {}
+
+
+def best_move(board, rows=4, cols=4, k=4, path=None):
+    # Best move on a rows x cols board with k in a row, from the tablebase
+    # for that shape; ValueError if the file holds another shape
+    path = path or default_path(rows, cols, k)
+    if path not in _tablebases:
+        _tablebases[path] = Tablebase(path)
+    tablebase = _tablebases[path]
+    tablebase.check_shape(rows, cols, k)
+    return tablebase.best_move(board)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a Tic Tac Toe tablebase")
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("-k", type=int, default=4, help="stones in a row needed to win")
+    parser.add_argument("--output", help="defaults to a file named after the board shape")
+    args = parser.parse_args()
+    args.output = args.output or default_path(args.rows, args.cols, args.k)
+
+    start = time.perf_counter()
+    solved = generate(args.rows, args.cols, args.k, args.output)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.output)
+    print(f"Solved {solved} positions in {elapsed:.1f} s, "
+          f"wrote {size / 1e6:.1f} MB to {args.output}")
+
+    start = time.perf_counter()
+    tablebase = Tablebase(args.output)
+    board = [" "] * (args.rows * args.cols)
+    print(f"Opened in {(time.perf_counter() - start) * 1000:.2f} ms; "
+          f"empty board is a {tablebase.result(board)} for X")
+
+
+if __name__ == "__main__":
+    main()
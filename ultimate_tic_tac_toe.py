@@ -0,0 +1,234 @@
+import argparse
+
+from tic_tac_toe import WIN_TABLE, FULL_MASK, EMPTY_CELLS
+
+
+class UltimateTicTacToe:
+    # Nine 3x3 sub-boards arranged in a 3x3 meta-board. A move is
+    # 9 * board + cell and sends the opponent to sub-board `cell`; if that
+    # sub-board is already won or full they may play in any open sub-board.
+    # Winning a sub-board claims its square on the meta-board, and three
+    # claimed squares in a row win the game.
+    #
+    # Every sub-board and the meta-board are 9-bit masks per side, so move
+    # generation and win checks are a few integer operations and lookups in
+    # the same tables the bitboard TicTacToe engine uses.
+
+    def __init__(self):
+        self.x_boards = [0] * 9
+        self.o_boards = [0] * 9
+        self.meta_x = 0
+        self.meta_o = 0
+        self.closed = 0  # Sub-boards that are won or full
+        self.next_board = -1  # Sub-board the next move must be in, -1 for any
+        self.current_player = "X"
+        self.move_stack = []
+        self.next_stack = []
+
+    @property
+    def board(self):
+        # 81 cells in row-major order of the full 9x9 grid
+        cells = [" "] * 81
+        for move in range(81):
+            sub, cell = divmod(move, 9)
+            row = sub // 3 * 3 + cell // 3
+            col = sub % 3 * 3 + cell % 3
+            if self.x_boards[sub] >> cell & 1:
+                cells[row * 9 + col] = "X"
+            elif self.o_boards[sub] >> cell & 1:
+                cells[row * 9 + col] = "O"
+        return cells
+
+    def open_boards(self):
+        if self.next_board >= 0:
+            return (self.next_board,)
+        return EMPTY_CELLS[self.closed]
+
+    def legal_moves(self):
+        if self.check_winner():
+            return []
+        moves = []
+        for sub in self.open_boards():
+            base = 9 * sub
+            moves.extend(base + cell
+                         for cell in EMPTY_CELLS[self.x_boards[sub] | self.o_boards[sub]])
+        return moves
+
+    def make_move(self, move):
+        sub, cell = divmod(move, 9)
+        bit = 1 << cell
+        if (not 0 <= move < 81 or self.closed >> sub & 1
+                or (self.next_board >= 0 and sub != self.next_board)
+                or (self.x_boards[sub] | self.o_boards[sub]) & bit
+                or self.check_winner()):
+            return False
+
+        if self.current_player == "X":
+            self.x_boards[sub] |= bit
+            if WIN_TABLE[self.x_boards[sub]]:
+                self.meta_x |= 1 << sub
+                self.closed |= 1 << sub
+            self.current_player = "O"
+        else:
+            self.o_boards[sub] |= bit
+            if WIN_TABLE[self.o_boards[sub]]:
+                self.meta_o |= 1 << sub
+                self.closed |= 1 << sub
+            self.current_player = "X"
+        if self.x_boards[sub] | self.o_boards[sub] == FULL_MASK:
+            self.closed |= 1 << sub
+
+        self.move_stack.append(move)
+        self.next_stack.append(self.next_board)
+        self.next_board = -1 if self.closed >> cell & 1 else cell
+        return True
+
+    def unmake_move(self):
+        move = self.move_stack.pop()
+        self.next_board = self.next_stack.pop()
+        sub, cell = divmod(move, 9)
+        mask = ~(1 << cell)
+        sub_bit = ~(1 << sub)
+        # A sub-board with a move left in it is neither won (it was open
+        # when the move was made) nor full
+        self.meta_x &= sub_bit
+        self.meta_o &= sub_bit
+        self.closed &= sub_bit
+        if self.current_player == "O":
+            self.x_boards[sub] &= mask
+            self.current_player = "X"
+        else:
+            self.o_boards[sub] &= mask
+            self.current_player = "O"
+        return move
+
+    def check_winner(self):
+        if WIN_TABLE[self.meta_x]:
+            return "X"
+        if WIN_TABLE[self.meta_o]:
+            return "O"
+        return None
+
+    def is_board_full(self):
+        # No sub-board left to play in
+        return self.closed == FULL_MASK
+
+    def random_playout(self, rng):
+        # Play uniformly random moves on local copies of the masks and
+        # return the winner (None for a tie); the game itself is unchanged
+        x_boards = self.x_boards[:]
+        o_boards = self.o_boards[:]
+        meta_x, meta_o, closed = self.meta_x, self.meta_o, self.closed
+        next_board = self.next_board
+        x_to_move = self.current_player == "X"
+        if WIN_TABLE[meta_x]:
+            return "X"
+        if WIN_TABLE[meta_o]:
+            return "O"
+        choice = rng.choice
+
+        while closed != FULL_MASK:
+            if next_board >= 0:
+                sub = next_board
+                cell = choice(EMPTY_CELLS[x_boards[sub] | o_boards[sub]])
+            else:
+                moves = [9 * sub + cell
+                         for sub in EMPTY_CELLS[closed]
+                         for cell in EMPTY_CELLS[x_boards[sub] | o_boards[sub]]]
+                sub, cell = divmod(choice(moves), 9)
+
+            bit = 1 << cell
+            if x_to_move:
+                x_boards[sub] |= bit
+                if WIN_TABLE[x_boards[sub]]:
+                    meta_x |= 1 << sub
+                    closed |= 1 << sub
+                    if WIN_TABLE[meta_x]:
+                        return "X"
+            else:
+                o_boards[sub] |= bit
+                if WIN_TABLE[o_boards[sub]]:
+                    meta_o |= 1 << sub
+                    closed |= 1 << sub
+                    if WIN_TABLE[meta_o]:
+                        return "O"
+            if x_boards[sub] | o_boards[sub] == FULL_MASK:
+                closed |= 1 << sub
+            next_board = -1 if closed >> cell & 1 else cell
+            x_to_move = not x_to_move
+        return None
+
+    def display_board(self):
+        board = self.board
+        for row in range(9):
+            cells = board[row * 9:row * 9 + 9]
+            print(" " + " || ".join(" | ".join(cells[i:i + 3]) for i in (0, 3, 6)) + " ")
+            if row == 8:
+                break
+            print("=" * 37 if row % 3 == 2 else
+                  "-----------++-----------++-----------")
+        meta = "".join("X" if self.meta_x >> sub & 1 else
+                       "O" if self.meta_o >> sub & 1 else
+                       "#" if self.closed >> sub & 1 else "."
+                       for sub in range(9))
+        print(f"\nMeta-board: {meta[0:3]} {meta[3:6]} {meta[6:9]}")
+
+
+def main(computer_time=1.0):
+    game = UltimateTicTacToe()
+    print("Welcome to Ultimate Tic Tac Toe!")
+    print("Sub-boards and cells are numbered 0-8, left to right, top to bottom")
+
+    computer = None
+    bot = None
+    if input("Play against the computer? (y/n): ").strip().lower().startswith("y"):
+        from tic_tac_toe_mcts import MCTS
+        computer = "O"
+        bot = MCTS()
+
+    while True:
+        game.display_board()
+        boards = game.open_boards()
+        where = f"sub-board {boards[0]}" if len(boards) == 1 else "any open sub-board"
+        print(f"\nPlayer {game.current_player}'s turn, play in {where}")
+
+        try:
+            if game.current_player == computer:
+                move = bot.search(game, time_limit=computer_time)
+                print(f"Computer plays {move // 9} {move % 9} "
+                      f"({bot.playouts} playouts)")
+            else:
+                text = input("Enter sub-board and cell (e.g. 4 0): ").split()
+                if len(boards) == 1 and len(text) == 1:
+                    text = [str(boards[0])] + text
+                sub, cell = (int(part) for part in text)
+                if not (0 <= sub <= 8 and 0 <= cell <= 8):
+                    print("Sub-board and cell must be between 0 and 8")
+                    continue
+                move = 9 * sub + cell
+
+            if not game.make_move(move):
+                print("That move is not allowed!")
+                continue
+
+            winner = game.check_winner()
+            if winner:
+                game.display_board()
+                print(f"\nPlayer {winner} wins!")
+                break
+
+            if game.is_board_full():
+                game.display_board()
+                print("\nIt's a tie!")
+                break
+
+        except ValueError:
+            print("Please enter two numbers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Ultimate Tic Tac Toe in the terminal")
+    parser.add_argument("--computer-time", type=float, default=1.0,
+                        help="seconds the computer may think per move")
+    args = parser.parse_args()
+    main(args.computer_time)
@@ -0,0 +1,160 @@
+import tkinter as tk
+
+from tic_tac_toe_gui import ComputerOpponent
+from ultimate_tic_tac_toe import UltimateTicTacToe
+
+# Seconds the computer may spend on a move
+COMPUTER_TIME_LIMIT = 1.0
+CELL_SIZE = 50
+
+# The worker process keeps one search tree for its whole life, so the
+# subtree under the moves played since its last search is reused
+_bot = None
+
+
+def search_move(moves, time_limit):
+    global _bot
+    from tic_tac_toe_mcts import MCTS
+    if _bot is None:
+        _bot = MCTS()
+    game = UltimateTicTacToe()
+    for move in moves:
+        game.make_move(move)
+    return _bot.search(game, time_limit=time_limit)
+
+
+class UltimateTicTacToeGUI(ComputerOpponent):
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Ultimate Tic Tac Toe")
+        self.game = UltimateTicTacToe()
+        self.game_over = False
+        self.marks = []
+        self.init_computer()
+
+        # Configure style
+        self.root.configure(bg='#2C3E50')
+        self.root.resizable(False, False)
+
+        # Title
+        title_label = tk.Label(root, text="Ultimate Tic Tac Toe",
+                               font=('Helvetica', 24, 'bold'),
+                               fg='#ECF0F1', bg='#2C3E50')
+        title_label.pack(pady=10)
+
+        # Player turn label
+        self.turn_label = tk.Label(root,
+                                   text="Player X's Turn",
+                                   font=('Helvetica', 16),
+                                   fg='#ECF0F1', bg='#2C3E50')
+        self.turn_label.pack(pady=5)
+
+        # Computer opponent toggle; the computer always plays O
+        self.vs_computer = tk.BooleanVar(value=False)
+        computer_check = tk.Checkbutton(root,
+                                        text="Play vs Computer",
+                                        variable=self.vs_computer,
+                                        font=('Helvetica', 12),
+                                        fg='#ECF0F1', bg='#2C3E50',
+                                        selectcolor='#34495E',
+                                        activebackground='#2C3E50',
+                                        activeforeground='#ECF0F1',
+                                        command=self.computer_move)
+        computer_check.pack()
+
+        # Game board: one background rectangle per sub-board, recoloured to
+        # show where the next move may go, under a fixed grid of lines
+        size = 9 * CELL_SIZE
+        self.canvas = tk.Canvas(root, width=size, height=size,
+                                bg='#34495E', highlightthickness=0)
+        self.canvas.pack(padx=10, pady=10)
+        self.sub_boards = []
+        for sub in range(9):
+            x = sub % 3 * 3 * CELL_SIZE
+            y = sub // 3 * 3 * CELL_SIZE
+            self.sub_boards.append(self.canvas.create_rectangle(
+                x, y, x + 3 * CELL_SIZE, y + 3 * CELL_SIZE, fill='#34495E', outline=''))
+        for i in range(1, 9):
+            width = 5 if i % 3 == 0 else 1
+            color = '#ECF0F1' if i % 3 == 0 else '#2C3E50'
+            self.canvas.create_line(0, i * CELL_SIZE, size, i * CELL_SIZE,
+                                    fill=color, width=width)
+            self.canvas.create_line(i * CELL_SIZE, 0, i * CELL_SIZE, size,
+                                    fill=color, width=width)
+        self.canvas.bind("<Button-1>", self.canvas_click)
+        self.update_open_boards()
+
+        # Reset button
+        reset_button = tk.Button(root,
+                                 text="New Game",
+                                 font=('Helvetica', 12),
+                                 bg='#27AE60',
+                                 fg='#ECF0F1',
+                                 activebackground='#219A52',
+                                 command=self.reset_game)
+        reset_button.pack(pady=10)
+
+    def canvas_click(self, event):
+        row = event.y // CELL_SIZE
+        col = event.x // CELL_SIZE
+        if self.pending is None and 0 <= row < 9 and 0 <= col < 9:
+            self.place((row // 3 * 3 + col // 3) * 9 + row % 3 * 3 + col % 3)
+
+    def place(self, move):
+        player = self.game.current_player
+        meta_before = self.game.meta_x | self.game.meta_o
+        if self.game_over or not self.game.make_move(move):
+            return
+        sub, cell = divmod(move, 9)
+        row = sub // 3 * 3 + cell // 3
+        col = sub % 3 * 3 + cell % 3
+        self.marks.append(self.canvas.create_text(
+            (col + 0.5) * CELL_SIZE, (row + 0.5) * CELL_SIZE,
+            text=player, font=('Helvetica', 20, 'bold'),
+            fill='#E74C3C' if player == 'X' else '#3498DB'))
+
+        # A newly won sub-board gets one large mark over it
+        if (self.game.meta_x | self.game.meta_o) != meta_before:
+            self.marks.append(self.canvas.create_text(
+                (sub % 3 * 3 + 1.5) * CELL_SIZE, (sub // 3 * 3 + 1.5) * CELL_SIZE,
+                text=player, font=('Helvetica', 96, 'bold'),
+                fill='#C0392B' if player == 'X' else '#2471A3'))
+        self.update_open_boards()
+
+        winner = self.game.check_winner()
+        if winner:
+            self.game_over = True
+            self.turn_label.config(text=f"Player {winner} wins!")
+        elif self.game.is_board_full():
+            self.game_over = True
+            self.turn_label.config(text="It's a tie!")
+        else:
+            self.turn_label.config(text=f"Player {self.game.current_player}'s Turn")
+            self.computer_move()
+
+    def update_open_boards(self):
+        open_boards = set() if self.game.check_winner() else set(self.game.open_boards())
+        for sub, item in enumerate(self.sub_boards):
+            self.canvas.itemconfig(item, fill='#2980B9' if sub in open_boards else '#34495E')
+
+    def search_task(self):
+        return search_move, (list(self.game.move_stack), COMPUTER_TIME_LIMIT)
+
+    def reset_game(self):
+        self.cancel_computer()
+        self.game = UltimateTicTacToe()
+        self.game_over = False
+        self.turn_label.config(text="Player X's Turn")
+        self.canvas.delete(*self.marks)
+        self.marks = []
+        self.update_open_boards()
+
+
+def main():
+    root = tk.Tk()
+    game = UltimateTicTacToeGUI(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()